@@ -110,7 +110,7 @@ class LoadBalancerAnalyticsIntegration:
             
             # Add load balancer specific metrics
             if self.lb_manager:
-                lb_stats = self.lb_manager.get_statistics()
+                lb_stats = self.lb_manager.get_counters()
                 summary['load_balancer'] = {
                     'active_connections': lb_stats.get('active_connections', 0),
                     'total_connections': lb_stats.get('total_connections', 0),
@@ -135,7 +135,7 @@ class LoadBalancerAnalyticsIntegration:
             return {'error': 'Load balancer manager not available'}
         
         try:
-            stats = self.lb_manager.get_statistics()
+            stats = self.lb_manager.get_counters()
             connections = self.lb_manager.list_connections()
             
             # Calculate performance metrics
@@ -400,7 +400,7 @@ class LoadBalancerAnalyticsIntegration:
             
             # This would depend on how the load balancer tracks errors
             # For now, return a placeholder calculation
-            stats = self.lb_manager.get_statistics()
+            stats = self.lb_manager.get_counters()
             total_connections = stats.get('total_connections', 0)
             
             # Placeholder error calculation
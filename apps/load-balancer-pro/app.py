@@ -1,23 +1,35 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for
+from flask import Flask, render_template, request, jsonify, redirect, url_for, g, Response, make_response
+from flask.json.provider import DefaultJSONProvider
 from flask_wtf import FlaskForm
+from flask_wtf.csrf import generate_csrf
+from markupsafe import Markup
 from wtforms import StringField, IntegerField, TextAreaField, SubmitField, SelectField, BooleanField
 from wtforms.validators import DataRequired, NumberRange, Optional
 import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 import json
 import time
+from datetime import timedelta
 import os
 import logging
-from datetime import datetime
+from typing import Tuple
 import plotly
 import plotly.graph_objs as go
 from plotly.subplots import make_subplots
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib encoder is used without it
+    orjson = None
+
 # Import our load balancer modules
 from loadbalancer import (
     LBManager, 
     StatsCollector, 
     GLOBAL_SHUTDOWN_EVENT, 
     create_test_servers,
+    shutdown_test_servers,
     test_client, 
     load_test, 
     syslog_forwarder,
@@ -25,9 +37,29 @@ from loadbalancer import (
     analytics_collector
 )
 
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider that encodes API responses with orjson."""
+    
+    _options = (orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS) if orjson else 0
+    
+    def dumps(self, obj, **kwargs) -> str:
+        return self.dumps_bytes(obj).decode()
+    
+    def dumps_bytes(self, obj) -> bytes:
+        return orjson.dumps(obj, default=self.default, option=self._options)
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj), mimetype=self.mimetype)
+
 # Create Flask app
 app = Flask(__name__)
-app.config['SECRET_KEY'] = os.urandom(24)
+if orjson is not None:
+    app.json = OrjsonProvider(app)
+app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY') or os.urandom(24)
 
 # Create data directory if it doesn't exist
 os.makedirs('data', exist_ok=True)
@@ -70,8 +102,226 @@ except Exception as e:
     logger.error(f"Error initializing analytics integration: {e}")
     lb_analytics_integration = None
 
-# Store test client results in a global variable
-test_client_results = []
+# Latest test client results. Writers append a new list and readers take
+# [-1]; both are single atomic deque operations, so no lock is needed
+test_client_results = deque([[]], maxlen=1)
+
+# Background runner for test-client and load-test jobs, one job at a time
+_test_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="loadgen")
+_test_job = None
+_test_job_lock = threading.Lock()
+
+# Figure skeletons for the indicator endpoints. The figures are built (and
+# validated by Plotly) once at import; requests only substitute their values
+# into the pre-serialized JSON.
+def _build_connections_template() -> str:
+    fig = go.Figure()
+    fig.add_trace(go.Indicator(
+        mode = "number",
+        value = 0,
+        title = {"text": "Active Connections"},
+        domain = {'row': 0, 'column': 0}
+    ))
+    
+    fig.add_trace(go.Indicator(
+        mode = "number",
+        value = 0,
+        title = {"text": "Total Connections"},
+        domain = {'row': 0, 'column': 1}
+    ))
+    
+    fig.update_layout(
+        grid = {'rows': 1, 'columns': 2},
+        margin=dict(l=20, r=20, t=30, b=20),
+    )
+    
+    fig_json = fig.to_plotly_json()
+    fig_json["data"][0]["value"] = "__ACTIVE__"
+    fig_json["data"][1]["value"] = "__TOTAL__"
+    return json.dumps(fig_json, cls=plotly.utils.PlotlyJSONEncoder)
+
+def _build_health_templates() -> Tuple[str, str]:
+    # Health ratio gauge; per-backend status lines are injected as annotations
+    fig = go.Figure()
+    fig.add_trace(go.Indicator(
+        mode="gauge+number",
+        value=0,
+        title={"text": "Backend Health %"},
+        domain={'row': 0, 'column': 0},
+        gauge={
+            'axis': {'range': [0, 100]},
+            'bar': {'color': "#19d3f3"},
+            'steps': [
+                {'range': [0, 33], 'color': "#ff0000"},
+                {'range': [33, 66], 'color': "#ffa500"},
+                {'range': [66, 100], 'color': "#00ff00"}
+            ],
+            'threshold': {
+                'line': {'color': "red", 'width': 4},
+                'thickness': 0.75,
+                'value': 50
+            }
+        }
+    ))
+    fig.update_layout(
+        height=300,
+        margin=dict(l=20, r=20, t=30, b=20)
+    )
+    fig_json = fig.to_plotly_json()
+    fig_json["data"][0]["value"] = "__HEALTH_PCT__"
+    fig_json["layout"]["annotations"] = "__ANNOTATIONS__"
+    template = json.dumps(fig_json, cls=plotly.utils.PlotlyJSONEncoder)
+    
+    # Static figure shown when no backends are configured
+    empty_fig = go.Figure()
+    empty_fig.add_annotation(
+        text="No backend servers configured",
+        x=0.5,
+        y=0.5,
+        xref="paper",
+        yref="paper",
+        showarrow=False,
+        font=dict(
+            family="Arial",
+            size=14
+        )
+    )
+    empty_fig.update_layout(
+        height=300,
+        margin=dict(l=20, r=20, t=30, b=20)
+    )
+    empty = json.dumps(empty_fig, cls=plotly.utils.PlotlyJSONEncoder)
+    return template, empty
+
+# Per-status (symbol, annotation font) for plot_health, indexed by the
+# backend's healthy flag
+_HEALTH_STATUS = (
+    ("✗", {"family": "Arial", "size": 14, "color": "red"}),
+    ("✓", {"family": "Arial", "size": 14, "color": "green"})
+)
+_HEALTH_STATUS_TEXT = "%s %s:%s  •  %sms"
+
+_CONNECTIONS_FIG_TEMPLATE = _build_connections_template()
+_HEALTH_FIG_TEMPLATE, _HEALTH_FIG_EMPTY = _build_health_templates()
+
+# Upper bound on history entries sent to the browser per request
+HISTORY_MAX_POINTS = 500
+
+def _downsample(history: list, max_points: int = HISTORY_MAX_POINTS) -> list:
+    """Thin a history list to evenly spaced entries, always keeping the newest."""
+    n = len(history)
+    if n <= max_points:
+        return history
+    step = n / max_points
+    return [history[n - 1 - int(i * step)] for i in range(max_points - 1, -1, -1)]
+
+# Statistics snapshot shared across requests for a short time so rapid
+# dashboard polls don't each take the LBManager lock
+STATS_CACHE_TTL = 0.25
+_stats_cache = (0.0, None, 0)
+_stats_cache_lock = threading.Lock()
+
+def _invalidate_stats() -> None:
+    """Drop the cached statistics snapshot (e.g. after start/stop)."""
+    global _stats_cache
+    with _stats_cache_lock:
+        _stats_cache = (0.0, None, 0)
+
+def _stats() -> dict:
+    """
+    Return lb_manager statistics, computed at most once per request and
+    reused across requests for STATS_CACHE_TTL seconds.
+    
+    The returned dict is shared; callers must not mutate it.
+    """
+    global _stats_cache
+    if g.get("stats") is None:
+        with _stats_cache_lock:
+            ts, cached, version = _stats_cache
+            now = time.monotonic()
+            if cached is None or now - ts >= STATS_CACHE_TTL:
+                # Read the version first so it never claims newer data than we hold
+                version = lb_manager.version
+                cached = lb_manager.get_statistics(include_connections=True)
+                _stats_cache = (now, cached, version)
+        g.stats = cached
+        g.stats_version = version
+    return g.stats
+
+# Prefix for ETags built from in-process version counters, so validators
+# handed out by an earlier run of the app never match
+_ETAG_PREFIX = os.urandom(4).hex()
+
+def _version_etag(*parts) -> str:
+    """Build an ETag from version counters and other cheap state."""
+    return "-".join([_ETAG_PREFIX] + [str(part) for part in parts])
+
+def _not_modified(etag: str):
+    """Return a 304 response if the client already holds etag, else None."""
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+    return None
+
+# Serialized analytics dashboards keyed by (timespan, analytics version)
+ANALYTICS_CACHE_TTL = 60.0
+ANALYTICS_CACHE_SIZE = 16
+_analytics_cache = OrderedDict()
+_analytics_cache_lock = threading.Lock()
+
+def _store_test_results(future) -> None:
+    """Publish the results of a finished test job."""
+    try:
+        test_client_results.append(future.result())
+    except Exception as e:
+        logger.error(f"Test job failed: {e}")
+
+def _submit_test_job(fn, *args) -> bool:
+    """Run a test job in the background; returns False if one is already running."""
+    global _test_job
+    with _test_job_lock:
+        if _test_job is not None and not _test_job.done():
+            return False
+        _test_job = _test_executor.submit(fn, *args)
+        _test_job.add_done_callback(_store_test_results)
+        return True
+
+# Seconds between change checks on /api/connections/stream
+CONNECTION_STREAM_INTERVAL = 1.0
+# Seconds one stream response lasts; EventSource reconnects by itself, so
+# a subscriber never holds a worker thread for good
+CONNECTION_STREAM_MAX_AGE = 300.0
+
+# (threshold, multiplier, suffix) for the data-transferred figure, largest
+# first; the units match the dashboard's JavaScript formatter
+_BYTE_UNITS = (
+    (1 << 20, 1.0 / (1 << 20), "MB"),
+    (1 << 10, 1.0 / (1 << 10), "KB"),
+)
+
+def _format_bytes(total_bytes: int) -> str:
+    """Format a byte count as B, KB or MB."""
+    for threshold, multiplier, suffix in _BYTE_UNITS:
+        if total_bytes >= threshold:
+            return "%.2f %s" % (total_bytes * multiplier, suffix)
+    return "%d B" % total_bytes
+
+def _format_uptime(seconds: float) -> str:
+    """Format an uptime in seconds as H:MM:SS, with days past 24 hours ("1 day, 2:03:04")."""
+    return str(timedelta(seconds=int(seconds)))
+
+def _json_bytes(obj) -> bytes:
+    """Encode obj with the app's JSON provider as UTF-8 bytes."""
+    if isinstance(app.json, OrjsonProvider):
+        return app.json.dumps_bytes(obj)
+    return app.json.dumps(obj).encode()
+
+def _connections_soa() -> dict:
+    """Columnar snapshot of the active connections, taken once per request."""
+    if "conns_soa" not in g:
+        g.conns_soa = lb_manager.list_connections_soa()
+    return g.conns_soa
 
 # Form for configuring the load balancer
 class LoadBalancerForm(FlaskForm):
@@ -120,35 +370,56 @@ class LoadTestForm(FlaskForm):
     messages_per_client = IntegerField('Messages Per Client', validators=[DataRequired(), NumberRange(min=1, max=10)], default=3)
     submit = SubmitField('Run Load Test')
 
+class _RenderedForm:
+    """
+    A shared, render-only dashboard form paired with this session's CSRF
+    field. Attribute lookups other than csrf_token go to the shared form.
+    """
+    __slots__ = ("_form", "csrf_token")
+    
+    def __init__(self, form: FlaskForm, csrf_token: Markup):
+        self._form = form
+        self.csrf_token = csrf_token
+    
+    def __getattr__(self, name: str):
+        return getattr(self._form, name)
+
+# Dashboard forms built once, without CSRF, since only the token differs
+# between page views; index() pairs them with the session's token. They
+# are only ever rendered, never bound to data or validated
+with app.test_request_context():
+    _START_FORM = LoadBalancerForm(formdata=None, meta={"csrf": False})
+    _TEST_FORM = TestClientForm(formdata=None, meta={"csrf": False})
+    _LOAD_TEST_FORM = LoadTestForm(formdata=None, meta={"csrf": False})
+
+def _csrf_field() -> Markup:
+    """The hidden CSRF input FlaskForm renders, carrying this session's token."""
+    # Markup's % escapes the token
+    return Markup('<input id="csrf_token" name="csrf_token" type="hidden" value="%s">') % generate_csrf()
+
 @app.route('/')
 def index():
     """Home page with load balancer configuration."""
-    start_form = LoadBalancerForm()
-    test_form = TestClientForm()
-    load_test_form = LoadTestForm()
+    csrf_token = _csrf_field()
+    start_form = _RenderedForm(_START_FORM, csrf_token)
+    test_form = _RenderedForm(_TEST_FORM, csrf_token)
+    load_test_form = _RenderedForm(_LOAD_TEST_FORM, csrf_token)
     
     # Get stats for display
-    stats = lb_manager.get_statistics()
+    stats = _stats()
     if stats["start_time"]:
-        uptime = datetime.now() - stats["start_time"]
-        uptime_str = str(uptime).split('.')[0]  # Remove microseconds
+        uptime_str = _format_uptime(stats["uptime"])
     else:
         uptime_str = "Not running"
     
     # Format data transferred
-    total_bytes = stats["bytes_sent"] + stats["bytes_received"]
-    if total_bytes < 1024:
-        data_str = f"{total_bytes} B"
-    elif total_bytes < 1024 * 1024:
-        data_str = f"{total_bytes / 1024:.2f} KB"
-    else:
-        data_str = f"{total_bytes / (1024 * 1024):.2f} MB"
+    data_str = _format_bytes(stats["bytes_sent"] + stats["bytes_received"])
     
     # For the connections table
-    connections = [conn.to_dict() for conn in lb_manager.list_connections()]
+    connections = stats["connections"]
     
     # Get connection history
-    history = stats.get("connection_history", [])
+    history = _downsample(stats.get("connection_history", []))
     
     return render_template('index.html', 
                           form=start_form,
@@ -160,7 +431,7 @@ def index():
                           data_transferred=data_str,
                           connections=connections,
                           history=history,
-                          client_results=test_client_results)
+                          client_results=test_client_results[-1])
 
 @app.route('/start', methods=['POST'])
 def start():
@@ -169,7 +440,8 @@ def start():
     if form.validate_on_submit():
         port = form.port.data
         backends_text = form.backends.data
-        backends = [line.strip() for line in backends_text.split('\n') if line.strip()]
+        # One pass: strip each line, drop the blank ones
+        backends = list(filter(None, map(str.strip, backends_text.splitlines())))
         
         if not backends:
             return jsonify({"status": "error", "message": "No backends specified"})
@@ -220,6 +492,7 @@ def start():
             
             # Start the load balancer
             lb_manager.start_listener(port, backends)
+            _invalidate_stats()
             
             return redirect(url_for('index'))
         except Exception as e:
@@ -245,6 +518,7 @@ def stop():
     
     # Stop the load balancer
     lb_manager.stop_listener()
+    _invalidate_stats()
     
     return redirect(url_for('index'))
 
@@ -263,8 +537,17 @@ def stop_test_servers():
     """Stop test backend servers."""
     global test_server_threads, test_server_ports
     if test_server_threads is not None:
-        GLOBAL_SHUTDOWN_EVENT.set()
-        time.sleep(1)  # Give servers time to shut down
+        shutdown_test_servers()
+        
+        # Servers wake as soon as their sockets are shut down; still bound
+        # the wait with a shared deadline
+        deadline = time.monotonic() + 1.0
+        for thread in test_server_threads:
+            thread.join(timeout=max(0.0, deadline - time.monotonic()))
+        still_running = [thread.name for thread in test_server_threads if thread.is_alive()]
+        if still_running:
+            logger.warning(f"Test servers still shutting down: {', '.join(still_running)}")
+        
         GLOBAL_SHUTDOWN_EVENT.clear()
         test_server_threads = None
         test_server_ports = None
@@ -275,7 +558,6 @@ def stop_test_servers():
 @app.route('/test-client', methods=['POST'])
 def run_test_client():
     """Run a test client."""
-    global test_client_results
     form = TestClientForm()
     if form.validate_on_submit():
         if not lb_manager.is_running():
@@ -288,15 +570,9 @@ def run_test_client():
         message = form.message.data or "Test message"
         num_messages = form.num_messages.data or 3
         
-        # Run test client in a background thread to avoid blocking
-        def run_client():
-            global test_client_results
-            results = test_client(port, message, num_messages)
-            test_client_results = results
-        
-        client_thread = threading.Thread(target=run_client)
-        client_thread.daemon = True
-        client_thread.start()
+        # Run test client in the background to avoid blocking
+        if not _submit_test_job(test_client, port, message, num_messages):
+            return jsonify({"status": "error", "message": "A test is already running"})
         
         return redirect(url_for('index'))
     return redirect(url_for('index'))
@@ -304,7 +580,6 @@ def run_test_client():
 @app.route('/load-test', methods=['POST'])
 def run_load_test():
     """Run a load test with multiple clients."""
-    global test_client_results
     form = LoadTestForm()
     if form.validate_on_submit():
         if not lb_manager.is_running():
@@ -317,15 +592,9 @@ def run_load_test():
         num_clients = form.num_clients.data or 5
         messages_per_client = form.messages_per_client.data or 3
         
-        # Run load test in a background thread
-        def run_test():
-            global test_client_results
-            results = load_test(port, num_clients, messages_per_client)
-            test_client_results = results
-        
-        test_thread = threading.Thread(target=run_test)
-        test_thread.daemon = True
-        test_thread.start()
+        # Run load test in the background
+        if not _submit_test_job(load_test, port, num_clients, messages_per_client):
+            return jsonify({"status": "error", "message": "A test is already running"})
         
         return redirect(url_for('index'))
     return redirect(url_for('index'))
@@ -333,165 +602,178 @@ def run_load_test():
 @app.route('/api/stats')
 def get_stats():
     """API endpoint to get current stats."""
-    stats = lb_manager.get_statistics()
-    connections = [conn.to_dict() for conn in lb_manager.list_connections()]
-    
-    # Get backend server information including health status
-    backend_servers = lb_manager.get_backend_servers()
-    
-    # Get current algorithm
-    algorithm = lb_manager.get_algorithm()
+    stats = dict(_stats())
+    connections = stats.pop("connections")
     
     # Get syslog configuration
     syslog_config = syslog_forwarder.get_config()
     
     # Get analytics integration status
     analytics_status = {
-        "integration_active": lb_analytics_integration is not None and lb_analytics_integration.is_running(),
+        "integration_active": lb_analytics_integration is not None and lb_analytics_integration.is_running,
         "integration_available": lb_analytics_integration is not None
     }
     
-    return jsonify({
-        "stats": stats,
-        "connections": connections,
-        "is_running": lb_manager.is_running(),
-        "backend_servers": backend_servers,
-        "algorithm": algorithm,
-        "syslog": syslog_config,
-        "analytics": analytics_status
-    })
+    # Everything else in the payload changes only with the load balancer
+    # version; uptime, byte counters and durations of open connections are
+    # allowed to lag until it moves (the dashboard advances uptime itself).
+    # Unchanged polls skip encoding.
+    etag = _version_etag(
+        g.stats_version,
+        int(analytics_status["integration_active"]),
+        "%x" % (hash(tuple(syslog_config.values())) & 0xffffffff)
+    )
+    not_modified = _not_modified(etag)
+    if not_modified is not None:
+        return not_modified
+    
+    stats["connection_history"] = _downsample(stats["connection_history"])
+    stats["health_check_history"] = _downsample(stats["health_check_history"])
+    
+    # Backend health, algorithm and running state in one lock pass
+    snapshot = lb_manager.get_snapshot()
+    
+    sections = (
+        ("stats", stats),
+        ("connections", connections),
+        ("is_running", snapshot["is_running"]),
+        ("backend_servers", snapshot["backend_servers"]),
+        ("algorithm", snapshot["algorithm"]),
+        ("syslog", syslog_config),
+        ("analytics", analytics_status)
+    )
+    
+    # Encode each section separately and stream the pieces
+    chunks = []
+    for i, (key, value) in enumerate(sections):
+        chunks.append((b'{"%s":' if i == 0 else b',"%s":') % key.encode())
+        chunks.append(_json_bytes(value))
+    chunks.append(b"}")
+    
+    response = Response(iter(chunks), mimetype="application/json")
+    response.set_etag(etag)
+    return response
 
 @app.route('/api/connections')
 def get_connections():
-    """API endpoint to get current connections."""
-    connections = [conn.to_dict() for conn in lb_manager.list_connections()]
-    return jsonify({"connections": connections})
+    """API endpoint to get current connections (one list per field)."""
+    return jsonify({"connections": _connections_soa()})
+
+@app.route('/api/connections/stream')
+def stream_connections():
+    """
+    Server-Sent Events feed of connection changes.
+    
+    Each event carries only the rows added, modified (byte counters or
+    active flag) or removed since the previous event, keyed by connection
+    id. The first event after (re)connecting lists every connection as
+    added. Durations are not diffed; the client extrapolates them from
+    the duration sent with each added row.
+    
+    A stream ends after CONNECTION_STREAM_MAX_AGE seconds, or at the first
+    write after the client has gone; browsers reconnect and resync.
+    """
+    def generate():
+        last = {}
+        synced = False
+        deadline = time.monotonic() + CONNECTION_STREAM_MAX_AGE
+        while time.monotonic() < deadline:
+            columns = lb_manager.list_connections_soa()
+            current = {}
+            added = []
+            modified = []
+            for i, conn_id in enumerate(columns["id"]):
+                state = (columns["bytes_sent"][i], columns["bytes_received"][i], columns["active"][i])
+                current[conn_id] = state
+                previous = last.get(conn_id)
+                if previous is None:
+                    added.append({field: values[i] for field, values in columns.items()})
+                elif previous != state:
+                    modified.append({
+                        "id": conn_id,
+                        "bytes_sent": state[0],
+                        "bytes_received": state[1],
+                        "active": state[2]
+                    })
+            removed = [conn_id for conn_id in last if conn_id not in current]
+            last = current
+            
+            if added or modified or removed or not synced:
+                synced = True
+                delta = {"add": added, "mod": modified, "del": removed}
+                yield b"data: " + _json_bytes(delta) + b"\n\n"
+            else:
+                # Comment line so a closed client is noticed on the next write
+                yield b": keepalive\n\n"
+            
+            time.sleep(CONNECTION_STREAM_INTERVAL)
+    
+    return Response(generate(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache"})
 
 @app.route('/api/client-results')
 def get_client_results():
     """API endpoint to get test client results."""
-    global test_client_results
-    return jsonify({"results": test_client_results})
+    return jsonify({"results": test_client_results[-1]})
 
 @app.route('/api/clear-results')
 def clear_results():
     """Clear test client results."""
-    global test_client_results
-    test_client_results = []
+    test_client_results.append([])
     return redirect(url_for('index'))
 
 @app.route('/api/plot/connections')
 def plot_connections():
     """Generate a plot of connections over time."""
     # Get connection data
-    stats = lb_manager.get_statistics()
-    connections = [conn.to_dict() for conn in lb_manager.list_connections()]
+    stats = _stats()
+    active_connections = len(stats["connections"])
     
     # Simple plot for now - this would be better with time series data
-    fig = go.Figure()
-    fig.add_trace(go.Indicator(
-        mode = "number",
-        value = len(connections),
-        title = {"text": "Active Connections"},
-        domain = {'row': 0, 'column': 0}
-    ))
-    
-    fig.add_trace(go.Indicator(
-        mode = "number",
-        value = stats["total_connections"],
-        title = {"text": "Total Connections"},
-        domain = {'row': 0, 'column': 1}
-    ))
-    
-    fig.update_layout(
-        grid = {'rows': 1, 'columns': 2},
-        margin=dict(l=20, r=20, t=30, b=20),
-    )
-    
-    graphJSON = json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
-    return graphJSON
+    return (_CONNECTIONS_FIG_TEMPLATE
+            .replace('"__ACTIVE__"', str(active_connections))
+            .replace('"__TOTAL__"', str(stats["total_connections"])))
 
 @app.route('/api/plot/health')
 def plot_health():
     """Generate a plot of backend health over time."""
-    stats = lb_manager.get_statistics()
+    # The plot only shows backend health and response times
+    etag = _version_etag("health", lb_manager.backends_version, lb_manager.health_version)
+    not_modified = _not_modified(etag)
+    if not_modified is not None:
+        return not_modified
+    
     backend_servers = lb_manager.get_backend_servers()
     
     # Create a health dashboard with multiple indicators
-    fig = go.Figure()
-    
-    # Add indicators for each backend server
     total_backends = len(backend_servers)
-    if total_backends > 0:
-        healthy_backends = sum(1 for backend in backend_servers if backend['healthy'])
-        
-        # Add health ratio gauge
-        fig.add_trace(go.Indicator(
-            mode="gauge+number",
-            value=100 * healthy_backends / total_backends,
-            title={"text": "Backend Health %"},
-            domain={'row': 0, 'column': 0},
-            gauge={
-                'axis': {'range': [0, 100]},
-                'bar': {'color': "#19d3f3"},
-                'steps': [
-                    {'range': [0, 33], 'color': "#ff0000"},
-                    {'range': [33, 66], 'color': "#ffa500"},
-                    {'range': [66, 100], 'color': "#00ff00"}
-                ],
-                'threshold': {
-                    'line': {'color': "red", 'width': 4},
-                    'thickness': 0.75,
-                    'value': 50
-                }
-            }
-        ))
-        
-        # Add individual server status
-        for i, backend in enumerate(backend_servers):
-            color = "green" if backend['healthy'] else "red"
-            symbol = "✓" if backend['healthy'] else "✗"
-            response_time = backend['response_time']
-            
-            # Create text display for server status
-            status_text = f"{symbol} {backend['host']}:{backend['port']}  •  {response_time}ms"
-            
-            # Add text annotation
-            fig.add_annotation(
-                text=status_text,
-                x=0.5,
-                y=0.7 - (i * 0.1),
-                xref="paper",
-                yref="paper",
-                showarrow=False,
-                font=dict(
-                    family="Arial",
-                    size=14,
-                    color=color
-                )
-            )
-    else:
+    if total_backends == 0:
         # If no backend servers, show empty message
-        fig.add_annotation(
-            text="No backend servers configured",
-            x=0.5,
-            y=0.5,
-            xref="paper",
-            yref="paper",
-            showarrow=False,
-            font=dict(
-                family="Arial",
-                size=14
-            )
-        )
+        response = make_response(_HEALTH_FIG_EMPTY)
+        response.set_etag(etag)
+        return response
     
-    fig.update_layout(
-        height=300,
-        margin=dict(l=20, r=20, t=30, b=20)
-    )
+    healthy_backends = sum(backend['healthy'] for backend in backend_servers)
     
-    graphJSON = json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
-    return graphJSON
+    # Add individual server status
+    annotations = []
+    for i, backend in enumerate(backend_servers):
+        symbol, font = _HEALTH_STATUS[backend['healthy']]
+        annotations.append({
+            "text": _HEALTH_STATUS_TEXT % (symbol, backend['host'], backend['port'], backend['response_time']),
+            "x": 0.5,
+            "y": 0.7 - (i * 0.1),
+            "xref": "paper",
+            "yref": "paper",
+            "showarrow": False,
+            "font": font
+        })
+    
+    response = make_response(_HEALTH_FIG_TEMPLATE
+                             .replace('"__HEALTH_PCT__"', app.json.dumps(100 * healthy_backends / total_backends))
+                             .replace('"__ANNOTATIONS__"', app.json.dumps(annotations)))
+    response.set_etag(etag)
+    return response
 
 @app.route('/api/plot/analytics')
 def plot_analytics():
@@ -499,18 +781,54 @@ def plot_analytics():
     # Get timespan from query parameter (default: 1 hour)
     timespan = request.args.get('timespan', 3600, type=int)
     
+    # The dashboard only changes when the collector stores new samples
+    key = (timespan, analytics_collector.version)
+    now = time.monotonic()
+    
+    # Revalidate at least once per cache TTL so the time window keeps sliding
+    etag = _version_etag("analytics", timespan, key[1], int(now // ANALYTICS_CACHE_TTL))
+    not_modified = _not_modified(etag)
+    if not_modified is not None:
+        return not_modified
+    
+    with _analytics_cache_lock:
+        cached = _analytics_cache.get(key)
+        if cached is not None and now - cached[0] < ANALYTICS_CACHE_TTL:
+            _analytics_cache.move_to_end(key)
+            fig_json = cached[1]
+        else:
+            fig_json = None
+    
+    if fig_json is not None:
+        response = make_response(fig_json)
+        response.set_etag(etag)
+        return response
+    
     # Create dashboard using the analytics collector
     fig = analytics_collector.create_dashboard(timespan)
     
-    # Convert to JSON
-    graphJSON = json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
-    return graphJSON
+    # Convert to JSON (Plotly uses orjson for this when it is installed)
+    fig_json = fig.to_json()
+    
+    with _analytics_cache_lock:
+        _analytics_cache[key] = (now, fig_json)
+        _analytics_cache.move_to_end(key)
+        # Drop expired entries (oldest first) and keep the cache bounded
+        while _analytics_cache:
+            oldest_key, (created, _) = next(iter(_analytics_cache.items()))
+            if len(_analytics_cache) <= ANALYTICS_CACHE_SIZE and now - created < ANALYTICS_CACHE_TTL:
+                break
+            del _analytics_cache[oldest_key]
+    
+    response = make_response(fig_json)
+    response.set_etag(etag)
+    return response
 
 @app.route('/api/analytics/status')
 def get_analytics_status():
     """Get analytics integration status and metrics."""
     status = {
-        "integration_active": lb_analytics_integration is not None and lb_analytics_integration.is_running(),
+        "integration_active": lb_analytics_integration is not None and lb_analytics_integration.is_running,
         "analytics_engine_connected": False,
         "last_sync_time": None,
         "metrics_collected": 0,
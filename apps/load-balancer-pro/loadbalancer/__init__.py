@@ -11,6 +11,10 @@ from loadbalancer.analytics import analytics_collector
 # Create a global shutdown event for graceful termination
 GLOBAL_SHUTDOWN_EVENT = threading.Event()
 
+# Listening sockets of running test servers, shut down to wake their accept()
+_test_server_sockets = set()
+_test_server_lock = threading.Lock()
+
 __version__ = "1.1.0"
 __all__ = [
     "LBManager", 
@@ -23,6 +27,7 @@ __all__ = [
     "analytics_collector", 
     "GLOBAL_SHUTDOWN_EVENT",
     "create_test_servers", 
+    "shutdown_test_servers", 
     "test_client", 
     "load_test"
 ]
@@ -55,7 +60,7 @@ def create_test_servers(num_servers=2, base_port=8081):
                 # Send the response
                 client_sock.sendall(response.encode('utf-8'))
         except Exception as e:
-            logger.error(f"Error handling client in test server {server_id}: {e}")
+            logger.error("Error handling client in test server %s: %s", server_id, e)
         finally:
             client_sock.close()
     
@@ -67,10 +72,13 @@ def create_test_servers(num_servers=2, base_port=8081):
         try:
             server_socket.bind(('0.0.0.0', port))
             server_socket.listen(5)
-            server_socket.settimeout(0.5)  # Allow checking for shutdown
+            with _test_server_lock:
+                _test_server_sockets.add(server_socket)
             
             logger.info(f"Server {server_id} listening on port {port}")
             
+            # Blocks in accept(); shutdown_test_servers() wakes it by shutting
+            # the socket down, so there is no timeout to poll the event with
             while not GLOBAL_SHUTDOWN_EVENT.is_set():
                 try:
                     client_sock, client_addr = server_socket.accept()
@@ -82,14 +90,14 @@ def create_test_servers(num_servers=2, base_port=8081):
                         daemon=True
                     )
                     client_thread.start()
-                except socket.timeout:
-                    continue
                 except Exception as e:
                     if not GLOBAL_SHUTDOWN_EVENT.is_set():
-                        logger.error(f"Error accepting connection on test server {server_id}: {e}")
+                        logger.error("Error accepting connection on test server %s: %s", server_id, e)
         except Exception as e:
             logger.error(f"Error in test server {server_id}: {e}")
         finally:
+            with _test_server_lock:
+                _test_server_sockets.discard(server_socket)
             server_socket.close()
             logger.info(f"Test server {server_id} stopped")
     
@@ -111,6 +119,18 @@ def create_test_servers(num_servers=2, base_port=8081):
         
     return server_threads, server_ports
 
+def shutdown_test_servers():
+    """Signal test servers to stop and wake any that are blocked in accept()."""
+    import socket
+    
+    GLOBAL_SHUTDOWN_EVENT.set()
+    with _test_server_lock:
+        for server_socket in _test_server_sockets:
+            try:
+                server_socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
 def test_client(lb_port, message="Test message", num_messages=1):
     """Test client to send messages to the load balancer."""
     import socket
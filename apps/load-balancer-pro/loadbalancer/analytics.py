@@ -10,11 +10,18 @@ import threading
 import json
 import os
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Dict, List, Optional, Any, Tuple
 import plotly.graph_objs as go
 from plotly.subplots import make_subplots
 
+from .series import Series, cutoff_time, wait_for_tick
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib parser is used without it
+    orjson = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -22,23 +29,101 @@ logging.basicConfig(
 )
 logger = logging.getLogger("loadbalancer.analytics")
 
+MAX_HISTORY_ENTRIES = 10000  # Approximately 1 week at 1-minute intervals
+MAX_LATENCY_ROWS = MAX_HISTORY_ENTRIES * 16  # One row per backend per sample
+HISTORY_FORMAT = 2  # Bump whenever a series' record layout changes
+MAX_PLOT_POINTS = 1200  # Points per plotted trace, about the width of a chart
+
+def _latency_by_backend(history: Dict[str, np.ndarray]) -> List[Tuple[str, np.ndarray, np.ndarray]]:
+    """Split latency history into (backend, timestamps, latencies) for each backend present."""
+    codes = history["backend"]
+    order = np.argsort(codes, kind="stable")
+    bounds = np.cumsum(np.bincount(codes, minlength=len(history["backends"])))[:-1]
+    return [
+        (backend, history["timestamp"][rows], history["latency"][rows])
+        for backend, rows in zip(history["backends"].tolist(), np.split(order, bounds))
+        if len(rows)
+    ]
+
+def _read_json(path: str) -> Any:
+    """Parse a JSON file, with orjson when it is installed."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+def _downsample(timestamps: np.ndarray, values: np.ndarray,
+                max_points: int = MAX_PLOT_POINTS) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Thin a trace to at most max_points points by splitting it into equal
+    buckets and keeping each bucket's minimum and maximum, so spikes survive.
+    The first and last points are always kept.
+    """
+    n = len(values)
+    if n <= max_points:
+        return timestamps, values
+    
+    stride = -(-n // ((max_points - 2) // 2))
+    buckets = -(-n // stride)
+    # Row indices per bucket; the oldest bucket is padded with row 0
+    index = np.arange(n - buckets * stride, n).clip(0).reshape(buckets, stride)
+    grouped = values[index]
+    rows = np.arange(buckets)
+    keep = np.union1d(index[rows, grouped.argmin(axis=1)], index[rows, grouped.argmax(axis=1)])
+    keep = np.union1d(keep, (0, n - 1))
+    return timestamps[keep], values[keep]
+
+def _trace(timestamps: np.ndarray, values: np.ndarray, **kwargs: Any) -> go.Scattergl:
+    """A trace of values over time, downsampled for plotting."""
+    x, y = _downsample(timestamps, values)
+    return go.Scattergl(x=x, y=y, **kwargs)
+
+def _health_percentage(history: Dict[str, np.ndarray]) -> np.ndarray:
+    """Healthy backends as a percentage of all backends, 0 where there are none."""
+    healthy = history["healthy_backends"].astype(float)
+    total = history["total_backends"]
+    return np.divide(healthy * 100, total, out=np.zeros_like(healthy), where=total > 0)
+
 class AnalyticsCollector:
     """Collects and stores historical analytics data."""
     
     def __init__(self, data_dir: str = "data"):
-        self._lock = threading.RLock()
+        self._lock = threading.Lock()  # Guards the running state and history writes
+        # Serializes saves: stop() saves while a collector thread that
+        # outlived its join may be saving too, and both would append the same rows
+        self._save_lock = threading.Lock()
         self._running = False
         self._data_dir = data_dir
         self._stop_event = threading.Event()
         self._thread = None
         self._interval = 60.0  # Store data every minute
         
-        # Historical data storage
-        self._connection_history = []
-        self._traffic_history = []
-        self._latency_history = []
-        self._health_history = []
+        # Historical data storage, one column per field. Running totals
+        # stay 64-bit; gauges, rates and latencies use the smallest type
+        # that holds them (changing a dtype needs a new HISTORY_FORMAT)
+        self._connection_history = Series({
+            "active_connections": np.int32,
+            "total_connections": np.int64
+        }, MAX_HISTORY_ENTRIES)
+        self._traffic_history = Series({
+            "bytes_sent": np.int64,
+            "bytes_received": np.int64,
+            "bytes_sent_rate": np.float32,
+            "bytes_received_rate": np.float32
+        }, MAX_HISTORY_ENTRIES)
+        # One row per backend per sample; backends are stored as codes into _backend_names
+        self._latency_history = Series({"backend": np.int16, "latency": np.float32}, MAX_LATENCY_ROWS)
+        self._backend_codes: Dict[str, int] = {}
+        self._backend_names: List[str] = []
+        self._health_history = Series({
+            "healthy_backends": np.int16,
+            "total_backends": np.int16
+        }, MAX_HISTORY_ENTRIES)
+        # Rows in each history file, and series.appended when it was last saved
+        self._file_rows: Dict[str, Optional[int]] = {}
+        self._saved_rows: Dict[str, int] = {}
+        self._saved_backends = 0  # Backend names in latency_backends.txt
         self._lb_manager = None
+        self._version = 0  # Bumped whenever new samples are stored
         
         # Ensure data directory exists
         os.makedirs(data_dir, exist_ok=True)
@@ -46,6 +131,11 @@ class AnalyticsCollector:
         # Load existing data if any
         self._load_data()
     
+    @property
+    def version(self) -> int:
+        """Counter that changes whenever new analytics samples are stored."""
+        return self._version
+    
     def set_lb_manager(self, lb_manager) -> None:
         """Set the load balancer manager instance."""
         self._lb_manager = lb_manager
@@ -75,250 +165,232 @@ class AnalyticsCollector:
             
             self._stop_event.set()
             self._running = False
-            
-            if self._thread and self._thread.is_alive():
-                self._thread.join(timeout=2.0)
-                
-            # Save data before stopping
-            self._save_data()
-            logger.info("Analytics collector stopped")
+            thread = self._thread
+        
+        # Join without the lock, which the collector takes to store samples
+        if thread and thread.is_alive():
+            thread.join(timeout=2.0)
+        
+        # Save data before stopping
+        self._save_data()
+        logger.info("Analytics collector stopped")
     
-    def get_connection_history(self, timespan: int = 3600) -> List[Dict]:
-        """Get connection history data for specified timespan in seconds."""
-        with self._lock:
-            if not self._connection_history:
-                return []
-            
-            # Filter by timespan
-            cutoff = datetime.now() - timedelta(seconds=timespan)
-            filtered = [entry for entry in self._connection_history if entry["timestamp"] > cutoff]
-            return filtered
+    def get_connection_history(self, timespan: int = 3600) -> Dict[str, np.ndarray]:
+        """
+        Get connection history data for specified timespan in seconds,
+        as one array per field (plus "timestamp").
+        """
+        # Readers need no lock; see Series
+        cutoff = cutoff_time(timespan)
+        return self._connection_history.since(cutoff)
     
-    def get_traffic_history(self, timespan: int = 3600) -> List[Dict]:
-        """Get traffic history data for specified timespan in seconds."""
-        with self._lock:
-            if not self._traffic_history:
-                return []
-            
-            # Filter by timespan
-            cutoff = datetime.now() - timedelta(seconds=timespan)
-            filtered = [entry for entry in self._traffic_history if entry["timestamp"] > cutoff]
-            return filtered
+    def get_traffic_history(self, timespan: int = 3600) -> Dict[str, np.ndarray]:
+        """
+        Get traffic history data for specified timespan in seconds,
+        as one array per field (plus "timestamp").
+        """
+        # Readers need no lock; see Series
+        cutoff = cutoff_time(timespan)
+        return self._traffic_history.since(cutoff)
     
-    def get_latency_history(self, timespan: int = 3600) -> List[Dict]:
-        """Get latency history data for specified timespan in seconds."""
-        with self._lock:
-            if not self._latency_history:
-                return []
-            
-            # Filter by timespan
-            cutoff = datetime.now() - timedelta(seconds=timespan)
-            filtered = [entry for entry in self._latency_history if entry["timestamp"] > cutoff]
-            return filtered
+    def get_latency_history(self, timespan: int = 3600) -> Dict[str, np.ndarray]:
+        """
+        Get latency history data for specified timespan in seconds, in long
+        form: one row per backend per sample, as "timestamp", "backend" (a
+        code into the "backends" array of names) and "latency" arrays.
+        """
+        # Readers need no lock; see Series
+        cutoff = cutoff_time(timespan)
+        return self._latency_since(cutoff)
     
-    def get_health_history(self, timespan: int = 3600) -> List[Dict]:
-        """Get health check history data for specified timespan in seconds."""
-        with self._lock:
-            if not self._health_history:
-                return []
-            
-            # Filter by timespan
-            cutoff = datetime.now() - timedelta(seconds=timespan)
-            filtered = [entry for entry in self._health_history if entry["timestamp"] > cutoff]
-            return filtered
+    def _latency_since(self, cutoff: np.datetime64) -> Dict[str, np.ndarray]:
+        """
+        Latency rows newer than cutoff (timestamp, backend code, latency),
+        plus the backend names the codes index into.
+        """
+        # Names are added before any row uses them, so slice the rows first
+        history = self._latency_history.since(cutoff)
+        history["backends"] = np.array(self._backend_names, dtype=str)
+        return history
+    
+    def _backend_code(self, backend: str) -> int:
+        """Small integer code for a backend name. Call with _lock held."""
+        code = self._backend_codes.get(backend)
+        if code is None:
+            code = self._backend_codes[backend] = len(self._backend_names)
+            self._backend_names.append(backend)
+        return code
+    
+    def get_health_history(self, timespan: int = 3600) -> Dict[str, np.ndarray]:
+        """
+        Get health check history data for specified timespan in seconds,
+        as one array per field (plus "timestamp").
+        """
+        # Readers need no lock; see Series
+        cutoff = cutoff_time(timespan)
+        return self._health_history.since(cutoff)
     
     def plot_connections_over_time(self, timespan: int = 3600) -> go.Figure:
         """Create a plot of connections over time."""
-        with self._lock:
-            history = self.get_connection_history(timespan)
-            
-            if not history:
-                # Return empty figure
-                fig = go.Figure()
-                fig.update_layout(
-                    title="Connections Over Time",
-                    xaxis_title="Time",
-                    yaxis_title="Connections",
-                    height=300
-                )
-                return fig
-            
-            # Extract data
-            timestamps = [entry["timestamp"] for entry in history]
-            active_conns = [entry["active_connections"] for entry in history]
-            total_conns = [entry["total_connections"] for entry in history]
-            
-            # Create figure
+        history = self.get_connection_history(timespan)
+        
+        if not len(history["timestamp"]):
+            # Return empty figure
             fig = go.Figure()
-            fig.add_trace(go.Scatter(
-                x=timestamps,
-                y=active_conns,
-                mode='lines',
-                name='Active Connections',
-                line=dict(color='#1976D2', width=2)
-            ))
-            fig.add_trace(go.Scatter(
-                x=timestamps,
-                y=total_conns,
-                mode='lines',
-                name='Total Connections',
-                line=dict(color='#388E3C', width=2, dash='dot')
-            ))
-            
             fig.update_layout(
                 title="Connections Over Time",
                 xaxis_title="Time",
                 yaxis_title="Connections",
                 height=300
             )
-            
             return fig
+        
+        # Extract data
+        timestamps = history["timestamp"]
+        active_conns = history["active_connections"]
+        total_conns = history["total_connections"]
+        
+        # Create figure
+        fig = go.Figure()
+        fig.add_trace(_trace(
+            timestamps, active_conns,
+            mode='lines',
+            name='Active Connections',
+            line=dict(color='#1976D2', width=2)
+        ))
+        fig.add_trace(_trace(
+            timestamps, total_conns,
+            mode='lines',
+            name='Total Connections',
+            line=dict(color='#388E3C', width=2, dash='dot')
+        ))
+        
+        fig.update_layout(
+            title="Connections Over Time",
+            xaxis_title="Time",
+            yaxis_title="Connections",
+            height=300
+        )
+        
+        return fig
     
     def plot_traffic_over_time(self, timespan: int = 3600) -> go.Figure:
         """Create a plot of traffic over time."""
-        with self._lock:
-            history = self.get_traffic_history(timespan)
-            
-            if not history:
-                # Return empty figure
-                fig = go.Figure()
-                fig.update_layout(
-                    title="Traffic Over Time",
-                    xaxis_title="Time",
-                    yaxis_title="Bytes/s",
-                    height=300
-                )
-                return fig
-            
-            # Extract data
-            timestamps = [entry["timestamp"] for entry in history]
-            bytes_sent = [entry["bytes_sent_rate"] for entry in history]
-            bytes_received = [entry["bytes_received_rate"] for entry in history]
-            
-            # Create figure
+        history = self.get_traffic_history(timespan)
+        
+        if not len(history["timestamp"]):
+            # Return empty figure
             fig = go.Figure()
-            fig.add_trace(go.Scatter(
-                x=timestamps,
-                y=bytes_sent,
-                mode='lines',
-                name='Bytes Sent/s',
-                line=dict(color='#2ca02c', width=2)
-            ))
-            fig.add_trace(go.Scatter(
-                x=timestamps,
-                y=bytes_received,
-                mode='lines',
-                name='Bytes Received/s',
-                line=dict(color='#d62728', width=2)
-            ))
-            
             fig.update_layout(
                 title="Traffic Over Time",
                 xaxis_title="Time",
                 yaxis_title="Bytes/s",
                 height=300
             )
-            
             return fig
+        
+        # Extract data
+        timestamps = history["timestamp"]
+        bytes_sent = history["bytes_sent_rate"]
+        bytes_received = history["bytes_received_rate"]
+        
+        # Create figure
+        fig = go.Figure()
+        fig.add_trace(_trace(
+            timestamps, bytes_sent,
+            mode='lines',
+            name='Bytes Sent/s',
+            line=dict(color='#2ca02c', width=2)
+        ))
+        fig.add_trace(_trace(
+            timestamps, bytes_received,
+            mode='lines',
+            name='Bytes Received/s',
+            line=dict(color='#d62728', width=2)
+        ))
+        
+        fig.update_layout(
+            title="Traffic Over Time",
+            xaxis_title="Time",
+            yaxis_title="Bytes/s",
+            height=300
+        )
+        
+        return fig
     
     def plot_latency_over_time(self, timespan: int = 3600) -> go.Figure:
         """Create a plot of backend latency over time."""
-        with self._lock:
-            history = self.get_latency_history(timespan)
-            
-            if not history:
-                # Return empty figure
-                fig = go.Figure()
-                fig.update_layout(
-                    title="Backend Latency",
-                    xaxis_title="Time",
-                    yaxis_title="Response Time (ms)",
-                    height=300
-                )
-                return fig
-            
-            # Extract data
-            timestamps = [entry["timestamp"] for entry in history]
-            
-            # Create figure
+        history = self.get_latency_history(timespan)
+        
+        if not len(history["timestamp"]):
+            # Return empty figure
             fig = go.Figure()
-            
-            # Add a trace for each backend
-            backend_data = {}
-            
-            for entry in history:
-                for backend, latency in entry["backend_latencies"].items():
-                    if backend not in backend_data:
-                        backend_data[backend] = {"timestamps": [], "latencies": []}
-                    
-                    backend_data[backend]["timestamps"].append(entry["timestamp"])
-                    backend_data[backend]["latencies"].append(latency)
-            
-            # Add traces
-            for backend, data in backend_data.items():
-                fig.add_trace(go.Scatter(
-                    x=data["timestamps"],
-                    y=data["latencies"],
-                    mode='lines',
-                    name=backend,
-                    line=dict(width=2)
-                ))
-            
             fig.update_layout(
                 title="Backend Latency",
                 xaxis_title="Time",
                 yaxis_title="Response Time (ms)",
                 height=300
             )
-            
             return fig
+        
+        # Create figure
+        fig = go.Figure()
+        
+        # Add a trace for each backend
+        for backend, timestamps, latencies in _latency_by_backend(history):
+            fig.add_trace(_trace(
+                timestamps, latencies,
+                mode='lines',
+                name=backend,
+                line=dict(width=2)
+            ))
+        
+        fig.update_layout(
+            title="Backend Latency",
+            xaxis_title="Time",
+            yaxis_title="Response Time (ms)",
+            height=300
+        )
+        
+        return fig
     
     def plot_health_over_time(self, timespan: int = 3600) -> go.Figure:
         """Create a plot of backend health over time."""
-        with self._lock:
-            history = self.get_health_history(timespan)
-            
-            if not history:
-                # Return empty figure
-                fig = go.Figure()
-                fig.update_layout(
-                    title="Backend Health",
-                    xaxis_title="Time",
-                    yaxis_title="Healthy Backends (%)",
-                    height=300
-                )
-                return fig
-            
-            # Extract data
-            timestamps = [entry["timestamp"] for entry in history]
-            health_percentage = []
-            
-            for entry in history:
-                if entry["total_backends"] > 0:
-                    percentage = (entry["healthy_backends"] / entry["total_backends"]) * 100
-                else:
-                    percentage = 0
-                health_percentage.append(percentage)
-            
-            # Create figure
+        history = self.get_health_history(timespan)
+        
+        if not len(history["timestamp"]):
+            # Return empty figure
             fig = go.Figure()
-            fig.add_trace(go.Scatter(
-                x=timestamps,
-                y=health_percentage,
-                mode='lines',
-                fill='tozeroy',
-                line=dict(color='#26a69a', width=2)
-            ))
-            
             fig.update_layout(
                 title="Backend Health",
                 xaxis_title="Time",
                 yaxis_title="Healthy Backends (%)",
-                height=300,
-                yaxis=dict(range=[0, 100])
+                height=300
             )
-            
             return fig
+        
+        # Extract data
+        timestamps = history["timestamp"]
+        health_percentage = _health_percentage(history)
+        
+        # Create figure
+        fig = go.Figure()
+        fig.add_trace(_trace(
+            timestamps, health_percentage,
+            mode='lines',
+            fill='tozeroy',
+            line=dict(color='#26a69a', width=2)
+        ))
+        
+        fig.update_layout(
+            title="Backend Health",
+            xaxis_title="Time",
+            yaxis_title="Healthy Backends (%)",
+            height=300,
+            yaxis=dict(range=[0, 100])
+        )
+        
+        return fig
     
     def create_dashboard(self, timespan: int = 3600) -> go.Figure:
         """Create a comprehensive dashboard with all analytics."""
@@ -330,17 +402,22 @@ class AnalyticsCollector:
             vertical_spacing=0.1
         )
         
+        # Slice all four series against the same cutoff
+        cutoff = cutoff_time(timespan)
+        conn_history = self._connection_history.since(cutoff)
+        traffic_history = self._traffic_history.since(cutoff)
+        latency_history = self._latency_since(cutoff)
+        health_history = self._health_history.since(cutoff)
+        
         # Add connection data
-        conn_history = self.get_connection_history(timespan)
-        if conn_history:
-            timestamps = [entry["timestamp"] for entry in conn_history]
-            active_conns = [entry["active_connections"] for entry in conn_history]
-            total_conns = [entry["total_connections"] for entry in conn_history]
+        if len(conn_history["timestamp"]):
+            timestamps = conn_history["timestamp"]
+            active_conns = conn_history["active_connections"]
+            total_conns = conn_history["total_connections"]
             
             fig.add_trace(
-                go.Scatter(
-                    x=timestamps, 
-                    y=active_conns, 
+                _trace(
+                    timestamps, active_conns,
                     mode='lines',
                     name='Active Connections',
                     line=dict(color='#1976D2', width=2)
@@ -348,9 +425,8 @@ class AnalyticsCollector:
                 row=1, col=1
             )
             fig.add_trace(
-                go.Scatter(
-                    x=timestamps, 
-                    y=total_conns, 
+                _trace(
+                    timestamps, total_conns,
                     mode='lines',
                     name='Total Connections',
                     line=dict(color='#388E3C', width=2, dash='dot')
@@ -359,16 +435,14 @@ class AnalyticsCollector:
             )
         
         # Add traffic data
-        traffic_history = self.get_traffic_history(timespan)
-        if traffic_history:
-            timestamps = [entry["timestamp"] for entry in traffic_history]
-            bytes_sent = [entry["bytes_sent_rate"] for entry in traffic_history]
-            bytes_received = [entry["bytes_received_rate"] for entry in traffic_history]
+        if len(traffic_history["timestamp"]):
+            timestamps = traffic_history["timestamp"]
+            bytes_sent = traffic_history["bytes_sent_rate"]
+            bytes_received = traffic_history["bytes_received_rate"]
             
             fig.add_trace(
-                go.Scatter(
-                    x=timestamps, 
-                    y=bytes_sent, 
+                _trace(
+                    timestamps, bytes_sent,
                     mode='lines',
                     name='Bytes Sent/s',
                     line=dict(color='#2ca02c', width=2)
@@ -376,9 +450,8 @@ class AnalyticsCollector:
                 row=1, col=2
             )
             fig.add_trace(
-                go.Scatter(
-                    x=timestamps, 
-                    y=bytes_received, 
+                _trace(
+                    timestamps, bytes_received,
                     mode='lines',
                     name='Bytes Received/s',
                     line=dict(color='#d62728', width=2)
@@ -387,25 +460,12 @@ class AnalyticsCollector:
             )
         
         # Add latency data
-        latency_history = self.get_latency_history(timespan)
-        if latency_history:
+        if len(latency_history["timestamp"]):
             # Add a trace for each backend
-            backend_data = {}
-            
-            for entry in latency_history:
-                for backend, latency in entry["backend_latencies"].items():
-                    if backend not in backend_data:
-                        backend_data[backend] = {"timestamps": [], "latencies": []}
-                    
-                    backend_data[backend]["timestamps"].append(entry["timestamp"])
-                    backend_data[backend]["latencies"].append(latency)
-            
-            # Add traces
-            for backend, data in backend_data.items():
+            for backend, timestamps, latencies in _latency_by_backend(latency_history):
                 fig.add_trace(
-                    go.Scatter(
-                        x=data["timestamps"],
-                        y=data["latencies"],
+                    _trace(
+                        timestamps, latencies,
                         mode='lines',
                         name=backend,
                         line=dict(width=2)
@@ -414,22 +474,13 @@ class AnalyticsCollector:
                 )
         
         # Add health data
-        health_history = self.get_health_history(timespan)
-        if health_history:
-            timestamps = [entry["timestamp"] for entry in health_history]
-            health_percentage = []
-            
-            for entry in health_history:
-                if entry["total_backends"] > 0:
-                    percentage = (entry["healthy_backends"] / entry["total_backends"]) * 100
-                else:
-                    percentage = 0
-                health_percentage.append(percentage)
+        if len(health_history["timestamp"]):
+            timestamps = health_history["timestamp"]
+            health_percentage = _health_percentage(health_history)
             
             fig.add_trace(
-                go.Scatter(
-                    x=timestamps,
-                    y=health_percentage,
+                _trace(
+                    timestamps, health_percentage,
                     mode='lines',
                     fill='tozeroy',
                     name='Backend Health',
@@ -463,26 +514,21 @@ class AnalyticsCollector:
     
     def _collector_loop(self) -> None:
         """Background thread to collect analytics data."""
-        last_save_time = time.time()
+        # Intervals use the monotonic clock so wall clock steps can't skew rates
+        last_save_time = time.monotonic()
         prev_bytes_sent = 0
         prev_bytes_received = 0
-        prev_time = time.time()
+        prev_time = time.monotonic()
+        next_tick = prev_time
         
         while not self._stop_event.is_set():
             try:
                 if self._lb_manager and self._lb_manager.is_running():
-                    # Get current stats
-                    stats = self._lb_manager.get_statistics()
+                    # Get current stats; the history lists are not needed here
+                    stats = self._lb_manager.get_counters()
                     backend_servers = self._lb_manager.get_backend_servers()
                     now = datetime.now()
-                    current_time = time.time()
-                    
-                    # Connection history
-                    connection_entry = {
-                        "timestamp": now,
-                        "active_connections": stats["active_connections"],
-                        "total_connections": stats["total_connections"]
-                    }
+                    current_time = time.monotonic()
                     
                     # Traffic history - calculate rates
                     time_diff = current_time - prev_time
@@ -492,52 +538,37 @@ class AnalyticsCollector:
                     bytes_sent_rate = (stats["bytes_sent"] - prev_bytes_sent) / time_diff
                     bytes_received_rate = (stats["bytes_received"] - prev_bytes_received) / time_diff
                     
-                    traffic_entry = {
-                        "timestamp": now,
-                        "bytes_sent": stats["bytes_sent"],
-                        "bytes_received": stats["bytes_received"],
-                        "bytes_sent_rate": bytes_sent_rate,
-                        "bytes_received_rate": bytes_received_rate
-                    }
-                    
-                    # Health history
-                    health_check_history = stats.get("health_check_history", [])
-                    if health_check_history:
-                        latest_health_check = health_check_history[-1]
-                        health_entry = {
-                            "timestamp": now,
-                            "healthy_backends": latest_health_check.get("healthy_backends", 0),
-                            "total_backends": latest_health_check.get("total_backends", 0)
-                        }
-                        with self._lock:
-                            self._health_history.append(health_entry)
-                    
-                    # Latency history
-                    latency_entry = {
-                        "timestamp": now,
-                        "backend_latencies": {}
-                    }
-                    
-                    for backend in backend_servers:
-                        backend_id = f"{backend['host']}:{backend['port']}"
-                        latency_entry["backend_latencies"][backend_id] = backend["response_time"]
+                    # Latest health check, if any
+                    latest_health_check = self._lb_manager.get_latest_health_check()
                     
-                    # Store entries
+                    # Store entries; each series drops its oldest rows past
+                    # MAX_HISTORY_ENTRIES on its own
                     with self._lock:
-                        self._connection_history.append(connection_entry)
-                        self._traffic_history.append(traffic_entry)
-                        self._latency_history.append(latency_entry)
-                        
-                        # Limit the size of history to avoid memory issues
-                        max_entries = 10000  # Approximately 1 week at 1-minute intervals
-                        if len(self._connection_history) > max_entries:
-                            self._connection_history = self._connection_history[-max_entries:]
-                        if len(self._traffic_history) > max_entries:
-                            self._traffic_history = self._traffic_history[-max_entries:]
-                        if len(self._latency_history) > max_entries:
-                            self._latency_history = self._latency_history[-max_entries:]
-                        if len(self._health_history) > max_entries:
-                            self._health_history = self._health_history[-max_entries:]
+                        self._connection_history.append(
+                            now,
+                            active_connections=stats["active_connections"],
+                            total_connections=stats["total_connections"]
+                        )
+                        self._traffic_history.append(
+                            now,
+                            bytes_sent=stats["bytes_sent"],
+                            bytes_received=stats["bytes_received"],
+                            bytes_sent_rate=bytes_sent_rate,
+                            bytes_received_rate=bytes_received_rate
+                        )
+                        for backend in backend_servers:
+                            self._latency_history.append(
+                                now,
+                                backend=self._backend_code(f"{backend['host']}:{backend['port']}"),
+                                latency=backend["response_time"]
+                            )
+                        if latest_health_check is not None:
+                            self._health_history.append(
+                                now,
+                                healthy_backends=latest_health_check.get("healthy_backends", 0),
+                                total_backends=latest_health_check.get("total_backends", 0)
+                            )
+                        self._version += 1
                     
                     # Save data periodically (every 15 minutes)
                     if current_time - last_save_time > 900:
@@ -552,113 +583,91 @@ class AnalyticsCollector:
             except Exception as e:
                 logger.error(f"Error in analytics collector: {e}")
             
-            # Sleep for the collection interval
-            time.sleep(self._interval)
+            next_tick = wait_for_tick(self._stop_event, next_tick, self._interval)
+    
+    def _history_series(self) -> Dict[str, Series]:
+        """Each history series by the name of its file."""
+        return {
+            "connection_history": self._connection_history,
+            "traffic_history": self._traffic_history,
+            "latency_history": self._latency_history,
+            "health_history": self._health_history
+        }
+    
+    def _history_file(self, name: str) -> str:
+        """Path of a series' records file for the current record layout."""
+        return os.path.join(self._data_dir, f"{name}.v{HISTORY_FORMAT}.bin")
     
     def _save_data(self) -> None:
-        """Save analytics data to disk."""
-        try:
-            with self._lock:
-                # Save connection history
-                with open(os.path.join(self._data_dir, "connection_history.json"), 'w') as f:
-                    history_data = []
-                    for entry in self._connection_history:
-                        history_data.append({
-                            "timestamp": entry["timestamp"].isoformat(),
-                            "active_connections": entry["active_connections"],
-                            "total_connections": entry["total_connections"]
-                        })
-                    json.dump(history_data, f)
-                
-                # Save traffic history
-                with open(os.path.join(self._data_dir, "traffic_history.json"), 'w') as f:
-                    traffic_data = []
-                    for entry in self._traffic_history:
-                        traffic_data.append({
-                            "timestamp": entry["timestamp"].isoformat(),
-                            "bytes_sent": entry["bytes_sent"],
-                            "bytes_received": entry["bytes_received"],
-                            "bytes_sent_rate": entry["bytes_sent_rate"],
-                            "bytes_received_rate": entry["bytes_received_rate"]
-                        })
-                    json.dump(traffic_data, f)
+        """
+        Save analytics data to disk. Each series lives in its own file of
+        raw records; only rows added since the last save are appended, and
+        a file is rewritten from memory once it holds twice what is kept.
+        """
+        with self._save_lock:
+            try:
+                # Copy under the lock, write without it
+                with self._lock:
+                    pending = {}
+                    for name, series in self._history_series().items():
+                        file_rows = self._file_rows.get(name)
+                        rewrite = file_rows is None or file_rows > 2 * series.max_entries
+                        after = 0 if rewrite else self._saved_rows.get(name, 0)
+                        pending[name] = (series.records(after), file_rows, rewrite, series.appended)
+                    backends = self._backend_names[:]
                 
-                # Save latency history
-                with open(os.path.join(self._data_dir, "latency_history.json"), 'w') as f:
-                    latency_data = []
-                    for entry in self._latency_history:
-                        latency_data.append({
-                            "timestamp": entry["timestamp"].isoformat(),
-                            "backend_latencies": entry["backend_latencies"]
-                        })
-                    json.dump(latency_data, f)
+                # Names first, so stored latency rows never refer to unknown codes
+                if len(backends) != self._saved_backends:
+                    path = os.path.join(self._data_dir, "latency_backends.txt")
+                    with open(path + ".tmp", 'w') as f:
+                        f.writelines(f"{backend}\n" for backend in backends)
+                    os.replace(path + ".tmp", path)
+                    self._saved_backends = len(backends)
                 
-                # Save health history
-                with open(os.path.join(self._data_dir, "health_history.json"), 'w') as f:
-                    health_data = []
-                    for entry in self._health_history:
-                        health_data.append({
-                            "timestamp": entry["timestamp"].isoformat(),
-                            "healthy_backends": entry["healthy_backends"],
-                            "total_backends": entry["total_backends"]
-                        })
-                    json.dump(health_data, f)
+                for name, (records, file_rows, rewrite, appended) in pending.items():
+                    path = self._history_file(name)
+                    # A failed append may leave a partial record; rewrite next time
+                    self._file_rows[name] = None
+                    if rewrite:
+                        with open(path + ".tmp", 'wb') as f:
+                            records.tofile(f)
+                        os.replace(path + ".tmp", path)
+                        self._file_rows[name] = len(records)
+                    else:
+                        with open(path, 'ab') as f:
+                            records.tofile(f)
+                        self._file_rows[name] = file_rows + len(records)
+                    self._saved_rows[name] = appended
                 
                 logger.info("Analytics data saved to disk")
-        except Exception as e:
-            logger.error(f"Error saving analytics data: {e}")
+            except Exception as e:
+                logger.error(f"Error saving analytics data: {e}")
     
     def _load_data(self) -> None:
         """Load analytics data from disk."""
         try:
-            # Load connection history
-            connection_file = os.path.join(self._data_dir, "connection_history.json")
-            if os.path.exists(connection_file):
-                with open(connection_file, 'r') as f:
-                    data = json.load(f)
-                    for entry in data:
-                        self._connection_history.append({
-                            "timestamp": datetime.fromisoformat(entry["timestamp"]),
-                            "active_connections": entry["active_connections"],
-                            "total_connections": entry["total_connections"]
-                        })
-            
-            # Load traffic history
-            traffic_file = os.path.join(self._data_dir, "traffic_history.json")
-            if os.path.exists(traffic_file):
-                with open(traffic_file, 'r') as f:
-                    data = json.load(f)
-                    for entry in data:
-                        self._traffic_history.append({
-                            "timestamp": datetime.fromisoformat(entry["timestamp"]),
-                            "bytes_sent": entry["bytes_sent"],
-                            "bytes_received": entry["bytes_received"],
-                            "bytes_sent_rate": entry["bytes_sent_rate"],
-                            "bytes_received_rate": entry["bytes_received_rate"]
-                        })
-            
-            # Load latency history
-            latency_file = os.path.join(self._data_dir, "latency_history.json")
-            if os.path.exists(latency_file):
-                with open(latency_file, 'r') as f:
-                    data = json.load(f)
-                    for entry in data:
-                        self._latency_history.append({
-                            "timestamp": datetime.fromisoformat(entry["timestamp"]),
-                            "backend_latencies": entry["backend_latencies"]
-                        })
-            
-            # Load health history
-            health_file = os.path.join(self._data_dir, "health_history.json")
-            if os.path.exists(health_file):
-                with open(health_file, 'r') as f:
-                    data = json.load(f)
-                    for entry in data:
-                        self._health_history.append({
-                            "timestamp": datetime.fromisoformat(entry["timestamp"]),
-                            "healthy_backends": entry["healthy_backends"],
-                            "total_backends": entry["total_backends"]
-                        })
+            if os.path.exists(self._history_file("connection_history")):
+                backends_file = os.path.join(self._data_dir, "latency_backends.txt")
+                if os.path.exists(backends_file):
+                    with open(backends_file, 'r') as f:
+                        for backend in f.read().splitlines():
+                            self._backend_code(backend)
+                    self._saved_backends = len(self._backend_names)
+                
+                for name, series in self._history_series().items():
+                    path = self._history_file(name)
+                    if not os.path.exists(path):
+                        continue
+                    # Skip a partial record left by an interrupted append,
+                    # and rewrite the file on the next save
+                    size = os.path.getsize(path)
+                    count = size // series.record_dtype.itemsize
+                    records = np.fromfile(path, dtype=series.record_dtype, count=count)
+                    series.extend(records)
+                    self._file_rows[name] = count if count * series.record_dtype.itemsize == size else None
+                    self._saved_rows[name] = series.appended
+            else:
+                self._load_json_data()
             
             logger.info(f"Loaded analytics data: {len(self._connection_history)} connection records, " +
                       f"{len(self._traffic_history)} traffic records, " +
@@ -667,6 +676,56 @@ class AnalyticsCollector:
                       
         except Exception as e:
             logger.error(f"Error loading analytics data: {e}")
+    
+    def _load_json_data(self) -> None:
+        """Load analytics data from the JSON files written by older versions."""
+        # Load connection history
+        connection_file = os.path.join(self._data_dir, "connection_history.json")
+        if os.path.exists(connection_file):
+            data = _read_json(connection_file)
+            for entry in data:
+                self._connection_history.append(
+                    datetime.fromisoformat(entry["timestamp"]),
+                    active_connections=entry["active_connections"],
+                    total_connections=entry["total_connections"]
+                )
+        
+        # Load traffic history
+        traffic_file = os.path.join(self._data_dir, "traffic_history.json")
+        if os.path.exists(traffic_file):
+            data = _read_json(traffic_file)
+            for entry in data:
+                self._traffic_history.append(
+                    datetime.fromisoformat(entry["timestamp"]),
+                    bytes_sent=entry["bytes_sent"],
+                    bytes_received=entry["bytes_received"],
+                    bytes_sent_rate=entry["bytes_sent_rate"],
+                    bytes_received_rate=entry["bytes_received_rate"]
+                )
+        
+        # Load latency history
+        latency_file = os.path.join(self._data_dir, "latency_history.json")
+        if os.path.exists(latency_file):
+            data = _read_json(latency_file)
+            for entry in data:
+                timestamp = datetime.fromisoformat(entry["timestamp"])
+                for backend, latency in entry["backend_latencies"].items():
+                    self._latency_history.append(
+                        timestamp,
+                        backend=self._backend_code(backend),
+                        latency=latency
+                    )
+        
+        # Load health history
+        health_file = os.path.join(self._data_dir, "health_history.json")
+        if os.path.exists(health_file):
+            data = _read_json(health_file)
+            for entry in data:
+                self._health_history.append(
+                    datetime.fromisoformat(entry["timestamp"]),
+                    healthy_backends=entry["healthy_backends"],
+                    total_backends=entry["total_backends"]
+                )
 
 # Global instance
 analytics_collector = AnalyticsCollector()
\ No newline at end of file
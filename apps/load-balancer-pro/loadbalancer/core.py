@@ -3,14 +3,21 @@ Core functionality for the load balancer.
 This module contains the main logic for the TCP load balancer.
 """
 
+import os
 import socket
+import selectors
+import errno
+import fcntl
 import threading
 import time
 import random
+import itertools
+import operator
+import bisect
+import hashlib
 import logging
-import uuid
 from typing import List, Dict, Tuple, Optional, Callable
-import queue
+import collections
 from datetime import datetime
 
 # Configure logging
@@ -23,26 +30,51 @@ logger = logging.getLogger("loadbalancer.core")
 class ConnectionInfo:
     """Class to store information about active connections."""
     
-    def __init__(self, conn_id: str, source: str, destination: str, start_time: datetime):
+    __slots__ = ("id", "source", "destination", "destination_address", "start_ns", "start_wall",
+                 "start_str", "bytes_sent", "bytes_received", "active")
+    
+    def __init__(self, conn_id: int, source: str, destination: str,
+                 start_time: Optional[datetime] = None,
+                 destination_address: Optional[Tuple[str, int]] = None):
         self.id = conn_id
         self.source = source
         self.destination = destination
-        self.start_time = start_time
+        self.destination_address = destination_address  # Backend (host, port), for lookups
+        self.start_ns = time.monotonic_ns()  # Durations are measured against this
+        # Wall-clock start, only for display; defaults to now
+        self.start_wall = start_time.timestamp() if start_time else time.time()
+        self.start_str = time.strftime('%H:%M:%S', time.localtime(self.start_wall))
         self.bytes_sent = 0
         self.bytes_received = 0
         self.active = True
+    
+    @property
+    def start_time(self) -> datetime:
+        """Wall-clock start as a datetime, built on demand."""
+        return datetime.fromtimestamp(self.start_wall)
+    
+    @property
+    def duration(self) -> float:
+        """Seconds since the connection started."""
+        return (time.monotonic_ns() - self.start_ns) / 1e9
         
     def __str__(self) -> str:
-        return f"ID:{self.id} | {self.source} -> {self.destination} | {self.start_time.strftime('%H:%M:%S')}"
+        return f"ID:{self.id:08x} | {self.source} -> {self.destination} | {self.start_str}"
     
-    def to_dict(self) -> Dict:
-        """Convert to dictionary for data processing."""
+    def to_dict(self, now_ns: Optional[int] = None) -> Dict:
+        """
+        Convert to dictionary for data processing.
+        Pass now_ns (a time.monotonic_ns() reading) to share one clock read
+        across many connections.
+        """
+        if now_ns is None:
+            now_ns = time.monotonic_ns()
         return {
-            "id": self.id,
+            "id": f"{self.id:08x}",
             "source": self.source,
             "destination": self.destination,
-            "start_time": self.start_time,
-            "duration": (datetime.now() - self.start_time).total_seconds(),
+            "start_time": self.start_str,
+            "duration": (now_ns - self.start_ns) / 1e9,
             "bytes_sent": self.bytes_sent,
             "bytes_received": self.bytes_received,
             "active": self.active
@@ -51,17 +83,41 @@ class ConnectionInfo:
 class BackendServer:
     """Class to represent a backend server with health check status."""
     
+    __slots__ = ("host", "port", "address", "sockaddr", "weight", "healthy", "last_checked",
+                 "response_time", "failed_checks", "successful_checks", "total_connections",
+                 "active_connections")
+    
     def __init__(self, host: str, port: int, weight: int = 1):
         self.host = host
         self.port = port
+        self.address = (host, port)  # Identifies the backend, as returned by pick_backend
+        self.sockaddr = self.address  # What to connect() to; see resolve()
         self.weight = weight
         self.healthy = True
         self.last_checked = datetime.now()
         self.response_time = 0  # in milliseconds
-        self.failed_checks = 0
+        self.failed_checks = 0  # Consecutive failed health checks
+        self.successful_checks = 0  # Consecutive successful health checks
         self.total_connections = 0
         self.active_connections = 0
         
+    def resolve(self) -> bool:
+        """
+        Look the host up, so connects and health checks skip the resolver;
+        returns whether the address changed. On failure the previous
+        address is kept, and a name that never resolved is looked up on
+        each connect. May block, so call it without locks held.
+        """
+        try:
+            sockaddr = socket.getaddrinfo(self.host, self.port, socket.AF_INET,
+                                          socket.SOCK_STREAM)[0][4]
+        except OSError as e:
+            logger.warning(f"Could not resolve backend {self.host}:{self.port}: {e}")
+            return False
+        changed = sockaddr != self.sockaddr
+        self.sockaddr = sockaddr
+        return changed
+    
     def __str__(self) -> str:
         status = "HEALTHY" if self.healthy else "UNHEALTHY"
         return f"{self.host}:{self.port} ({status})"
@@ -76,10 +132,535 @@ class BackendServer:
             "last_checked": self.last_checked,
             "response_time": self.response_time,
             "failed_checks": self.failed_checks,
+            "successful_checks": self.successful_checks,
             "total_connections": self.total_connections,
             "active_connections": self.active_connections
         }
 
+# Kernel-side forwarding: on Linux bytes are spliced socket -> pipe -> socket
+# without ever being copied into Python
+_SPLICE_FLAGS = getattr(os, "SPLICE_F_MOVE", 0) | getattr(os, "SPLICE_F_NONBLOCK", 0)
+_HAS_SPLICE = hasattr(os, "splice") and hasattr(os, "pipe2")
+_DEFAULT_PIPE_SIZE = 65536  # Linux default when F_GETPIPE_SZ is unavailable
+
+# Sort key for least-connections picks; a C-level getter, unlike a lambda
+_active_connections = operator.attrgetter("active_connections")
+
+def _ring_hash(key: str) -> int:
+    """64-bit position on the IP_HASH ring for a client IP or virtual node key."""
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+def _tune_socket(sock: socket.socket) -> None:
+    """
+    Set the options every proxied socket gets: no Nagle delay on small
+    writes, and keepalive probes so dead peers are eventually noticed.
+    Buffer sizes are left to the kernel's autotuning.
+    """
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+
+def _open_pipe() -> Tuple[int, int, int]:
+    """Create a non-blocking pipe, returning (read fd, write fd, capacity)."""
+    pipe_r, pipe_w = os.pipe2(os.O_NONBLOCK | os.O_CLOEXEC)
+    if hasattr(fcntl, "F_GETPIPE_SZ"):
+        size = fcntl.fcntl(pipe_w, fcntl.F_GETPIPE_SZ)
+    else:
+        size = _DEFAULT_PIPE_SIZE
+    return pipe_r, pipe_w, size
+
+class _Endpoint:
+    """One side (client or backend) of a proxied connection in the reactor."""
+    
+    __slots__ = ("sock", "fd", "peer", "conn", "is_client", "outbuf", "pipe_r", "pipe_w",
+                 "pending", "pipe_blocked", "limit", "connected", "eof", "shut_wr", "events")
+    
+    def __init__(self, sock: socket.socket, conn: ConnectionInfo, is_client: bool, connected: bool):
+        self.sock = sock
+        self.fd = sock.fileno()
+        self.peer = None  # The opposite endpoint
+        self.conn = conn
+        self.is_client = is_client
+        self.outbuf = bytearray()  # Bytes waiting to be written to this socket
+        self.pipe_r = None  # Pipe holding spliced bytes for this socket, if any
+        self.pipe_w = None
+        self.pending = 0  # Bytes sitting in the pipe
+        self.pipe_blocked = False  # Pipe refused more bytes; wait for a drain
+        self.limit = _Reactor.MAX_BUFFER  # Most bytes to hold for this socket
+        self.connected = connected
+        self.eof = False  # Peer of this socket has stopped sending
+        self.shut_wr = False  # We have half-closed this socket for writing
+        self.events = 0  # Events currently registered with the selector
+    
+    def attach_pipe(self, pipe: Tuple[int, int, int]) -> None:
+        """Route bytes for this socket through a kernel pipe (splice mode)."""
+        self.pipe_r, self.pipe_w, self.limit = pipe
+    
+    def detach_pipe(self) -> Optional[Tuple[int, int, int]]:
+        """
+        Hand back the pipe if it is empty and can be reused by another
+        connection; a pipe still holding bytes is closed instead.
+        """
+        if self.pipe_r is None or self.pending:
+            self.close_pipe()
+            return None
+        
+        pipe = (self.pipe_r, self.pipe_w, self.limit)
+        self.pipe_r = self.pipe_w = None
+        self.pipe_blocked = False
+        self.limit = _Reactor.MAX_BUFFER
+        return pipe
+    
+    def close_pipe(self) -> None:
+        """Close the pipe, if any, and go back to userspace buffering."""
+        for fd in (self.pipe_r, self.pipe_w):
+            if fd is not None:
+                os.close(fd)
+        self.pipe_r = self.pipe_w = None
+        self.pending = 0
+        self.pipe_blocked = False
+        self.limit = _Reactor.MAX_BUFFER
+    
+    def has_pending(self) -> bool:
+        """Whether bytes are waiting to be written to this socket."""
+        return self.pending > 0 or len(self.outbuf) > 0
+    
+    def is_full(self) -> bool:
+        """Whether reading from the peer should pause until this socket drains."""
+        return self.pipe_blocked or self.pending + len(self.outbuf) >= self.limit
+    
+    def close(self) -> None:
+        """Close the socket and the pipe, if any."""
+        self.close_pipe()
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+class _Reactor:
+    """
+    Single-threaded event loop that accepts clients and moves bytes between
+    each client and its backend using non-blocking sockets.
+    
+    Bytes waiting to be written to an endpoint are held either in a kernel
+    pipe, when os.splice() is available (Linux), or in a bytearray. Reading
+    from a socket stops while its peer holds a full pipe/buffer, so a slow
+    reader applies backpressure instead of growing memory. EOF on one side
+    is propagated to the other with shutdown(SHUT_WR), and the connection is
+    closed once both directions are finished.
+    """
+    
+    RECV_SIZE = 65536  # Bytes per recv() call
+    MAX_BUFFER = 262144  # Stop reading a side once its peer has this much pending
+    PIPE_POOL_SIZE = 64  # Empty pipes kept for reuse by later connections
+    ACCEPT_BATCH = 64  # Most accepts per wakeup, so open connections still get served
+    MAX_CONNECTIONS = 4096  # Proxied at once; further clients wait in the listen backlog
+    ACCEPT_RETRY_DELAY = 0.1  # Seconds accepts stay paused after running out of descriptors
+    
+    def __init__(self, manager: "LBManager", server_socket: socket.socket, use_splice: bool = _HAS_SPLICE,
+                 warm_connections: int = 0, backend_sockaddrs: Optional[Dict[Tuple[str, int], Tuple[str, int]]] = None):
+        self._manager = manager
+        self._server = server_socket
+        self._selector = selectors.DefaultSelector()
+        self._endpoints = set()
+        self._use_splice = use_splice
+        self._pipes = []  # Empty pipes left by closed connections
+        self._connections = 0  # Connections currently proxied
+        # Bytes written to clients/backends; only this thread writes them, so
+        # readers can take them without a lock (possibly a little stale)
+        self.bytes_received = 0
+        self.bytes_sent = 0
+        self._accepting = True  # Whether the listening socket is registered
+        self._accept_retry_at = None  # monotonic() time to resume accepts paused by EMFILE/ENFILE
+        # Resolved address to connect to, per backend (host, port); shared
+        # with the manager, which replaces an entry when a backend moves
+        self._sockaddrs = backend_sockaddrs if backend_sockaddrs is not None else {}
+        # Spare backend connections opened ahead of clients, per (host, port);
+        # each is handed to one client and never reused after it
+        self._warm_connections = warm_connections
+        self._warm = {address: [] for address in self._sockaddrs}
+        # Only this thread reads sockets, so one receive buffer serves every
+        # connection on the buffered path
+        self._recv_buf = bytearray(self.RECV_SIZE)
+        self._recv_view = memoryview(self._recv_buf)
+        
+        self._server.setblocking(False)
+        self._selector.register(self._server, selectors.EVENT_READ, None)
+        # Other threads write a byte here to interrupt select(), e.g. on stop
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ, self._wake_r)
+    
+    def wake(self) -> None:
+        """Interrupt the reactor's select() from another thread."""
+        try:
+            self._wake_w.send(b"\0")
+        except OSError:
+            pass  # A wakeup is already pending, or the reactor has stopped
+    
+    def run(self, stop_event: threading.Event) -> None:
+        """Serve connections until stop_event is set, then close them all."""
+        for address in self._warm:
+            self._warm_up(address)
+        
+        try:
+            while not stop_event.is_set():
+                timeout = None
+                if self._accept_retry_at is not None:
+                    timeout = self._accept_retry_at - time.monotonic()
+                    if timeout <= 0:
+                        logger.info("Retrying accepts after running out of descriptors")
+                        self._resume_accepts()
+                        timeout = None
+                for key, mask in self._selector.select(timeout):
+                    endpoint = key.data
+                    if endpoint is None:
+                        self._accept()
+                        continue
+                    if endpoint is self._wake_r:
+                        self._drain_wakeups()
+                        continue
+                    
+                    if mask & selectors.EVENT_WRITE and endpoint.conn.active:
+                        self._on_writable(endpoint)
+                    if mask & selectors.EVENT_READ and endpoint.conn.active:
+                        self._on_readable(endpoint)
+        finally:
+            self._accepting = True  # Closing below must not re-register the listener
+            for endpoint in list(self._endpoints):
+                if endpoint.is_client:
+                    self._close(endpoint, None)
+            self._selector.close()
+            self._wake_r.close()
+            self._wake_w.close()
+            for pipe_r, pipe_w, _ in self._pipes:
+                os.close(pipe_r)
+                os.close(pipe_w)
+            self._pipes.clear()
+            for pool in self._warm.values():
+                for sock in pool:
+                    sock.close()
+                pool.clear()
+    
+    def _drain_wakeups(self) -> None:
+        """Discard the bytes wake() wrote; the loop condition does the rest."""
+        try:
+            while self._wake_r.recv(4096):
+                pass
+        except (BlockingIOError, InterruptedError):
+            pass
+    
+    def _accept(self) -> None:
+        """Accept pending clients, up to ACCEPT_BATCH per wakeup."""
+        for _ in range(self.ACCEPT_BATCH):
+            if not self._accepting:
+                return
+            try:
+                client_sock, addr = self._server.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                logger.error("Error accepting connection: %s", e)
+                if e.errno in (errno.EMFILE, errno.ENFILE, errno.ENOBUFS, errno.ENOMEM):
+                    # The listener stays readable, so select() would return
+                    # at once forever; wait for a close or a short timer
+                    self._pause_accepts()
+                    self._accept_retry_at = time.monotonic() + self.ACCEPT_RETRY_DELAY
+                return
+            self._admit(client_sock, addr)
+    
+    def _pause_accepts(self) -> None:
+        """Stop watching the listening socket; clients wait in the listen backlog."""
+        if self._accepting:
+            self._selector.unregister(self._server)
+            self._accepting = False
+    
+    def _resume_accepts(self) -> None:
+        """Watch the listening socket again after _pause_accepts."""
+        self._accept_retry_at = None
+        if not self._accepting:
+            self._selector.register(self._server, selectors.EVENT_READ, None)
+            self._accepting = True
+    
+    def _admit(self, client_sock: socket.socket, addr: Tuple[str, int]) -> None:
+        """Pick a backend for an accepted client and start a non-blocking connect."""
+        try:
+            client_sock.setblocking(False)
+            _tune_socket(client_sock)
+        except OSError as e:
+            # The client reset before it could be admitted
+            logger.warning("Dropping client %s:%s: %s", addr[0], addr[1], e)
+            client_sock.close()
+            return
+        conn_id = self._manager.next_connection_id()
+        
+        try:
+            host, port = self._manager.pick_backend(addr[0])
+        except Exception as e:
+            logger.error("Error handling client %08x: %s", conn_id, e)
+            client_sock.close()
+            return
+        
+        backend_sock = self._take_warm((host, port))
+        if backend_sock is None:
+            try:
+                backend_sock = self._new_backend_socket()
+            except OSError as e:
+                # e.g. out of descriptors (EMFILE/ENFILE); turn this client
+                # away and keep serving the others
+                logger.error("Error handling client %08x: %s", conn_id, e)
+                self._manager.release_backend((host, port))
+                client_sock.close()
+                return
+            try:
+                err = backend_sock.connect_ex(self._sockaddrs.get((host, port), (host, port)))
+            except socket.gaierror:
+                # The host name did not resolve at start and still does not
+                err = errno.EHOSTUNREACH
+        else:
+            # Its connect may still be in flight; SO_ERROR settles it on the
+            # first writable event, as for a fresh one
+            err = errno.EINPROGRESS
+        
+        conn = ConnectionInfo(
+            conn_id=conn_id,
+            source=f"{addr[0]}:{addr[1]}",
+            destination=f"{host}:{port}",
+            destination_address=(host, port)
+        )
+        self._manager.add_connection(conn)
+        
+        client = _Endpoint(client_sock, conn, is_client=True, connected=True)
+        backend = _Endpoint(backend_sock, conn, is_client=False, connected=False)
+        client.peer = backend
+        backend.peer = client
+        self._endpoints.add(client)
+        self._endpoints.add(backend)
+        
+        self._connections += 1
+        if self._connections >= self.MAX_CONNECTIONS:
+            # Stop accepting until a connection closes; the kernel queues
+            # new clients in the listen backlog meanwhile
+            logger.warning("Connection limit of %d reached, pausing accepts", self.MAX_CONNECTIONS)
+            self._pause_accepts()
+        
+        if self._use_splice:
+            try:
+                client.attach_pipe(self._take_pipe())
+                backend.attach_pipe(self._take_pipe())
+            except OSError as e:
+                # Out of descriptors for pipes; copy through userspace instead
+                logger.warning("Falling back to buffered forwarding for %08x: %s", conn_id, e)
+                self._release_pipe(client)
+                self._release_pipe(backend)
+        
+        if err == 0:
+            backend.connected = True
+        elif err not in (errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EAGAIN):
+            self._close(client, OSError(err, os.strerror(err)))
+            return
+        
+        self._update(client)
+        self._update(backend)
+        
+        if self._warm_connections:
+            self._warm_up((host, port))
+    
+    def _new_backend_socket(self) -> socket.socket:
+        """Create a non-blocking, tuned socket for a backend connection."""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            sock.setblocking(False)
+            _tune_socket(sock)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+    
+    def _warm_up(self, address: Tuple[str, int]) -> None:
+        """Open connections to a backend until its spare pool is full."""
+        pool = self._warm.setdefault(address, [])
+        while len(pool) < self._warm_connections:
+            try:
+                sock = self._new_backend_socket()
+            except OSError as e:
+                logger.warning("Could not open a spare connection to %s:%s: %s", address[0], address[1], e)
+                return
+            try:
+                err = sock.connect_ex(self._sockaddrs.get(address, address))
+            except socket.gaierror:
+                err = errno.EHOSTUNREACH
+            if err not in (0, errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EAGAIN):
+                # Backend unreachable; clients will find out on their own connect
+                sock.close()
+                return
+            pool.append(sock)
+    
+    def _take_warm(self, address: Tuple[str, int]) -> Optional[socket.socket]:
+        """Return a spare connection to the backend that is still usable, if any."""
+        pool = self._warm.get(address)
+        while pool:
+            sock = pool.pop()
+            try:
+                if sock.recv(1, socket.MSG_PEEK) == b"":
+                    # The backend closed it while it sat idle
+                    sock.close()
+                    continue
+            except (BlockingIOError, InterruptedError):
+                pass  # Idle, as it should be, or still connecting
+            except OSError:
+                # The connect failed or the backend reset it
+                sock.close()
+                continue
+            return sock
+        return None
+    
+    def _take_pipe(self) -> Tuple[int, int, int]:
+        """Reuse an empty pipe from a closed connection, or create one."""
+        if self._pipes:
+            return self._pipes.pop()
+        return _open_pipe()
+    
+    def _release_pipe(self, endpoint: _Endpoint) -> None:
+        """Return the endpoint's pipe to the pool if it is empty and there is room."""
+        pipe = endpoint.detach_pipe()
+        if pipe is None:
+            return
+        if len(self._pipes) < self.PIPE_POOL_SIZE:
+            self._pipes.append(pipe)
+        else:
+            os.close(pipe[0])
+            os.close(pipe[1])
+    
+    def _on_readable(self, endpoint: _Endpoint) -> None:
+        """Move what is available from a socket into its peer's pipe or buffer."""
+        peer = endpoint.peer
+        try:
+            if peer.pipe_w is not None:
+                while peer.pending < peer.limit:
+                    try:
+                        moved = os.splice(endpoint.fd, peer.pipe_w, peer.limit - peer.pending,
+                                          flags=_SPLICE_FLAGS)
+                    except BlockingIOError:
+                        # With bytes already queued the pipe may be out of
+                        # buffer slots rather than the socket being drained;
+                        # stop reading until the peer takes some
+                        peer.pipe_blocked = peer.pending > 0
+                        break
+                    if not moved:
+                        peer.eof = True
+                        break
+                    peer.pending += moved
+            else:
+                while len(peer.outbuf) < peer.limit:
+                    received = endpoint.sock.recv_into(self._recv_buf, self.RECV_SIZE)
+                    if not received:
+                        peer.eof = True
+                        break
+                    peer.outbuf += self._recv_view[:received]
+                    if received < self.RECV_SIZE:
+                        break
+        except (BlockingIOError, InterruptedError):
+            pass
+        except OSError as e:
+            self._close(endpoint, e)
+            return
+        
+        self._flush(peer)
+    
+    def _on_writable(self, endpoint: _Endpoint) -> None:
+        """Finish a pending backend connect or drain the endpoint's pipe/buffer."""
+        if not endpoint.connected:
+            err = endpoint.sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+            if err:
+                self._close(endpoint, OSError(err, os.strerror(err)))
+                return
+            endpoint.connected = True
+            self._update(endpoint.peer)
+        
+        self._flush(endpoint)
+    
+    def _flush(self, endpoint: _Endpoint) -> None:
+        """Write as much of the endpoint's pending bytes as the socket accepts."""
+        conn = endpoint.conn
+        if endpoint.connected and endpoint.has_pending():
+            try:
+                if endpoint.pipe_r is not None:
+                    sent = os.splice(endpoint.pipe_r, endpoint.fd, endpoint.pending,
+                                     flags=_SPLICE_FLAGS)
+                    endpoint.pending -= sent
+                    endpoint.pipe_blocked = False
+                else:
+                    sent = endpoint.sock.send(endpoint.outbuf)
+                    del endpoint.outbuf[:sent]
+            except (BlockingIOError, InterruptedError):
+                sent = 0
+            except OSError as e:
+                self._close(endpoint, e)
+                return
+            
+            if endpoint.is_client:
+                conn.bytes_received += sent
+                self.bytes_received += sent
+            else:
+                conn.bytes_sent += sent
+                self.bytes_sent += sent
+        
+        # Propagate EOF once everything the peer sent has been delivered
+        if endpoint.eof and not endpoint.has_pending() and endpoint.connected and not endpoint.shut_wr:
+            try:
+                endpoint.sock.shutdown(socket.SHUT_WR)
+            except OSError:
+                pass
+            endpoint.shut_wr = True
+        
+        if endpoint.shut_wr and endpoint.peer.shut_wr:
+            self._close(endpoint, None)
+            return
+        
+        self._update(endpoint)
+        self._update(endpoint.peer)
+    
+    def _update(self, endpoint: _Endpoint) -> None:
+        """Register the events the endpoint currently needs with the selector."""
+        events = 0
+        if not endpoint.connected or endpoint.has_pending():
+            events |= selectors.EVENT_WRITE
+        if endpoint.connected and not endpoint.peer.eof and not endpoint.peer.is_full():
+            events |= selectors.EVENT_READ
+        
+        if events == endpoint.events:
+            return
+        if endpoint.events == 0:
+            self._selector.register(endpoint.sock, events, endpoint)
+        elif events == 0:
+            self._selector.unregister(endpoint.sock)
+        else:
+            self._selector.modify(endpoint.sock, events, endpoint)
+        endpoint.events = events
+    
+    def _close(self, endpoint: _Endpoint, error: Optional[Exception]) -> None:
+        """Close both sockets of a connection and drop it from the manager."""
+        conn = endpoint.conn
+        if error is not None:
+            logger.error("Error handling client %08x: %s", conn.id, error)
+        
+        for side in (endpoint, endpoint.peer):
+            if side.events:
+                self._selector.unregister(side.sock)
+                side.events = 0
+            self._release_pipe(side)
+            side.close()
+            self._endpoints.discard(side)
+        
+        self._connections -= 1
+        if not self._accepting:
+            # Below the connection limit, and a descriptor is free again
+            logger.info("Connection closed, resuming accepts")
+            self._resume_accepts()
+        
+        self._manager.remove_connection(conn.id)
+
 class LBManager:
     """Manager class for the load balancer."""
     
@@ -90,10 +671,21 @@ class LBManager:
     RANDOM = "random"
     IP_HASH = "ip_hash"
     
+    CONN_SHARDS = 16  # Active connection dicts, each with its own lock (power of two)
+    LISTEN_BACKLOG = 4096  # Pending connections per listening socket (capped by somaxconn)
+    MAX_PENDING_UPDATES = 1024  # Connection updates kept for get_updates
+    RING_POINTS = 160  # IP_HASH ring points per unit of backend weight
+    HASH_LOAD_FACTOR = 1.25  # IP_HASH backends take at most this times the average load
+    
     def __init__(self):
-        self._active_conns = {}  # Dictionary of active connections
-        self._backends = []  # List of backend server objects
-        self._backend_index = 0  # Current index for round-robin
+        # Active connections, sharded by ID so accepts and closes on different
+        # connections rarely wait on the same lock
+        self._conn_shards = tuple(({}, threading.Lock()) for _ in range(self.CONN_SHARDS))
+        self._backends = ()  # Backend server objects; replaced, never mutated
+        self._backend_by_addr = {}  # (host, port) -> backend in _backends
+        self._backend_sockaddrs = {}  # (host, port) -> address to connect to, read by the reactors
+        self._pick_tables = (-1, (), (), ((), ()))  # See _build_pick_tables
+        self._rr_counter = itertools.count()  # Round-robin position
         self._algorithm = self.ROUND_ROBIN  # Default algorithm
         self._health_check_interval = 10  # Seconds between health checks
         self._health_check_timeout = 2  # Seconds to wait for response
@@ -101,89 +693,206 @@ class LBManager:
         self._unhealthy_threshold = 3  # Failed checks before marking unhealthy
         self._healthy_threshold = 2  # Successful checks before marking healthy again
         self._enable_health_checks = True  # Enable or disable health checking
+        self._warm_connections = 0  # Spare connections kept open to each backend (0 = off)
+        self._reactor_count = 1  # Reactor threads, each with its own listening socket
         self._health_check_thread = None  # Thread for health checking
+        self._conn_ids = itertools.count(1)  # Source of connection IDs
         self._lock = threading.RLock()  # Lock for thread safety
+        self._stats_lock = threading.Lock()  # Guards self._statistics and self._reactors
+        self._reactors = []  # Running reactors, whose byte totals are not yet in _statistics
         self._running = False  # Flag to indicate if the load balancer is running
-        self._listener_thread = None  # Thread for accepting connections
-        self._stop_event = threading.Event()  # Event to signal stop
-        self._conn_updates = queue.Queue()  # Queue of connection updates for UI
+        self._listener_threads = []  # Reactor threads accepting and proxying connections
+        self._backend_counts_lock = threading.Lock()  # Guards backend connection counters
+        self._stop_event = threading.Event()  # Stops the current listener; replaced on each start
+        self._conn_updates = collections.deque(maxlen=self.MAX_PENDING_UPDATES)  # Connection updates for UI
+        self._updates_ready = threading.Condition(threading.Lock())  # Guards _conn_updates
+        self._version = 0  # Bumped on any change to connections, backends or settings
+        self._backends_version = 0  # Bumped when backend servers or their health change
+        self._health_version = 0  # Bumped after every health check round
+        self._start_ns = None  # time.monotonic_ns() when the listener started, for uptime
         self._statistics = {
             "total_connections": 0,
             "active_connections": 0,
-            "bytes_sent": 0,
+            "bytes_sent": 0,  # Totals of reactors that have stopped
             "bytes_received": 0,
             "start_time": None,
-            "connection_history": [],  # Limited history of connections
-            "health_check_history": []  # History of health check results
+            "connection_history": collections.deque(maxlen=100),  # Last 100 closed connections
+            "health_check_history": collections.deque(maxlen=100)  # Last 100 health check results
         }
     
+    def next_connection_id(self) -> int:
+        """Return a new connection ID, unique for the lifetime of the manager."""
+        return next(self._conn_ids)
+    
+    def _conn_shard(self, conn_id: int) -> Tuple[Dict[int, ConnectionInfo], threading.Lock]:
+        """Return the (connections, lock) shard that holds conn_id."""
+        return self._conn_shards[hash(conn_id) & (self.CONN_SHARDS - 1)]
+    
     def add_connection(self, conn: ConnectionInfo) -> None:
         """Add a new connection to the active list."""
-        with self._lock:
-            self._active_conns[conn.id] = conn
+        conns, lock = self._conn_shard(conn.id)
+        with lock:
+            conns[conn.id] = conn
+        
+        with self._stats_lock:
             self._statistics["total_connections"] += 1
             self._statistics["active_connections"] += 1
-            self._conn_updates.put(("add", conn))
+            self._version += 1
+        self._push_update("add", conn)
     
-    def remove_connection(self, conn_id: str) -> None:
+    def remove_connection(self, conn_id: int) -> None:
         """Remove a connection by its ID."""
-        with self._lock:
-            if conn_id in self._active_conns:
-                conn = self._active_conns[conn_id]
-                conn.active = False
-                
-                # Update statistics
-                self._statistics["active_connections"] -= 1
-                self._statistics["bytes_sent"] += conn.bytes_sent
-                self._statistics["bytes_received"] += conn.bytes_received
-                
-                # Store in history (limit to 100 entries)
-                self._statistics["connection_history"].append(conn.to_dict())
-                if len(self._statistics["connection_history"]) > 100:
-                    self._statistics["connection_history"].pop(0)
-                
-                # Update backend server stats if found
-                try:
-                    dest_parts = conn.destination.split(':')
-                    dest_host, dest_port = dest_parts[0], int(dest_parts[1])
-                    
-                    # Find the backend server
-                    for backend in self._backends:
-                        if backend.host == dest_host and backend.port == dest_port:
-                            backend.active_connections -= 1
-                            break
-                except Exception as e:
-                    logger.error(f"Error updating backend stats: {e}")
-                
-                # Remove from active connections
-                del self._active_conns[conn_id]
-                self._conn_updates.put(("remove", conn))
+        conns, lock = self._conn_shard(conn_id)
+        with lock:
+            conn = conns.pop(conn_id, None)
+        if conn is None:
+            return
+        
+        conn.active = False
+        
+        with self._stats_lock:
+            # Update statistics
+            self._statistics["active_connections"] -= 1
+            
+            # Store in history; the deque drops the oldest entry past 100
+            self._statistics["connection_history"].append(conn.to_dict())
+            self._version += 1
+        
+        self.release_backend(conn.destination_address)
+        self._push_update("remove", conn)
+    
+    def release_backend(self, address: Tuple[str, int]) -> None:
+        """Give back the active connection pick_backend counted against a backend."""
+        backend = self._backend_by_addr.get(address)
+        if backend is not None:
+            with self._backend_counts_lock:
+                backend.active_connections -= 1
+    
+    def _push_update(self, action: str, conn: ConnectionInfo) -> None:
+        """Queue a connection update, dropping the oldest one if nobody is consuming them."""
+        with self._updates_ready:
+            self._conn_updates.append((action, conn))
+            self._updates_ready.notify()
     
     def list_connections(self) -> List[ConnectionInfo]:
-        """Return a list of all active connections."""
-        with self._lock:
-            return list(self._active_conns.values())
+        """Return a list of all active connections, taking each shard lock in turn."""
+        snapshot = []
+        for conns, lock in self._conn_shards:
+            with lock:
+                snapshot.extend(conns.values())
+        return snapshot
     
-    def get_statistics(self) -> Dict:
-        """Get current statistics."""
-        with self._lock:
-            stats = self._statistics.copy()
-            stats["active_connections"] = len(self._active_conns)
-            
-            # Calculate uptime if running
-            if stats["start_time"]:
-                stats["uptime"] = (datetime.now() - stats["start_time"]).total_seconds()
-            else:
-                stats["uptime"] = 0
-                
-            return stats
+    def list_connections_soa(self) -> Dict[str, List]:
+        """Return active connections as parallel columns, one list per field."""
+        conns = self.list_connections()
+        
+        now_ns = time.monotonic_ns()
+        return {
+            "id": [f"{conn.id:08x}" for conn in conns],
+            "source": [conn.source for conn in conns],
+            "destination": [conn.destination for conn in conns],
+            "start_time": [conn.start_str for conn in conns],
+            "duration": [(now_ns - conn.start_ns) / 1e9 for conn in conns],
+            "bytes_sent": [conn.bytes_sent for conn in conns],
+            "bytes_received": [conn.bytes_received for conn in conns],
+            "active": [conn.active for conn in conns]
+        }
+    
+    @property
+    def version(self) -> int:
+        """
+        Counter that changes whenever connections, backends or settings change.
+        Byte counters of connections still in flight do not bump it.
+        """
+        return self._version
+    
+    @property
+    def backends_version(self) -> int:
+        """
+        Counter that changes whenever the backend servers change or a backend
+        turns healthy or unhealthy. The pick tables are rebuilt on it.
+        """
+        return self._backends_version
+    
+    @property
+    def health_version(self) -> int:
+        """Counter that changes after every health check round, whatever its results."""
+        return self._health_version
+    
+    def _counters(self) -> Dict:
+        """Build the scalar statistics; call with self._stats_lock held."""
+        statistics = self._statistics
+        counters = {
+            "total_connections": statistics["total_connections"],
+            "active_connections": statistics["active_connections"],
+            "bytes_sent": statistics["bytes_sent"],
+            "bytes_received": statistics["bytes_received"],
+            "start_time": statistics["start_time"]
+        }
+        
+        # Running reactors count bytes as they are forwarded
+        for reactor in self._reactors:
+            counters["bytes_sent"] += reactor.bytes_sent
+            counters["bytes_received"] += reactor.bytes_received
+        
+        # Calculate uptime if running
+        start_ns = self._start_ns
+        if counters["start_time"] and start_ns is not None:
+            counters["uptime"] = (time.monotonic_ns() - start_ns) / 1e9
+        else:
+            counters["uptime"] = 0
+        return counters
+    
+    def get_counters(self) -> Dict:
+        """
+        Get the connection and byte totals, start time and uptime, without
+        the history lists that get_statistics also copies.
+        """
+        with self._stats_lock:
+            return self._counters()
+    
+    def get_history(self) -> Tuple[Dict, ...]:
+        """Get the most recent closed connections, oldest first."""
+        with self._stats_lock:
+            return tuple(self._statistics["connection_history"])
+    
+    def get_latest_health_check(self) -> Optional[Dict]:
+        """Get the most recent health check summary, or None before the first."""
+        with self._stats_lock:
+            history = self._statistics["health_check_history"]
+            return history[-1] if history else None
+    
+    def get_statistics(self, include_connections: bool = False) -> Dict:
+        """
+        Get current statistics: the counters plus both history lists.
+        With include_connections, the active connections are snapshotted in
+        the same call and returned as dicts under stats["connections"].
+        """
+        with self._stats_lock:
+            stats = self._counters()
+            # Copies, since callers iterate them outside the lock
+            stats["connection_history"] = list(self._statistics["connection_history"])
+            stats["health_check_history"] = list(self._statistics["health_check_history"])
+        
+        if include_connections:
+            conns = self.list_connections()
+            stats["active_connections"] = len(conns)
+            now_ns = time.monotonic_ns()
+            stats["connections"] = [conn.to_dict(now_ns) for conn in conns]
+        return stats
     
     def get_updates(self, block: bool = False, timeout: Optional[float] = None) -> Tuple[str, ConnectionInfo]:
-        """Get connection updates from the queue."""
-        try:
-            return self._conn_updates.get(block=block, timeout=timeout)
-        except queue.Empty:
-            return None, None
+        """Get the oldest pending connection update, or (None, None) if there is none.
+        
+        At most MAX_PENDING_UPDATES updates are kept; older ones are dropped
+        when the consumer falls behind.
+        """
+        with self._updates_ready:
+            if block and not self._conn_updates:
+                self._updates_ready.wait_for(lambda: self._conn_updates, timeout)
+            if not self._conn_updates:
+                return None, None
+            return self._conn_updates.popleft()
     
     def set_algorithm(self, algorithm: str) -> None:
         """Set the load balancing algorithm."""
@@ -193,6 +902,7 @@ class LBManager:
         
         with self._lock:
             self._algorithm = algorithm
+            self._version += 1
             logger.info(f"Load balancing algorithm set to {algorithm}")
     
     def get_algorithm(self) -> str:
@@ -205,6 +915,23 @@ class LBManager:
         with self._lock:
             return [backend.to_dict() for backend in self._backends]
     
+    def get_snapshot(self) -> Dict:
+        """
+        Get backend servers, algorithm and running state together.
+        The lock is taken once, so callers get a consistent view and avoid
+        contending for it once per getter.
+        """
+        with self._lock:
+            backends = [backend.to_dict() for backend in self._backends]
+            algorithm = self._algorithm
+            running = self._running
+        
+        return {
+            "backend_servers": backends,
+            "algorithm": algorithm,
+            "is_running": running
+        }
+    
     def set_health_check_config(self, interval: int = 10, timeout: int = 2, 
                                path: str = "/", unhealthy_threshold: int = 3, 
                                healthy_threshold: int = 2, enabled: bool = True) -> None:
@@ -221,6 +948,35 @@ class LBManager:
             if self._running and self._enable_health_checks:
                 self._start_health_checker()
     
+    def set_reactor_count(self, count: int) -> None:
+        """
+        Accept and proxy connections on count reactor threads. Each binds its
+        own listening socket with SO_REUSEPORT, so the kernel spreads new
+        connections across their accept queues. One by default: under the
+        GIL the threads only overlap in system calls, which pays off for
+        accept-heavy loads on Linux. Takes effect the next time the listener
+        starts.
+        """
+        if count < 1:
+            raise ValueError(f"Invalid reactor count: {count}")
+        if count > 1 and not hasattr(socket, "SO_REUSEPORT"):
+            raise ValueError("Multiple reactors need SO_REUSEPORT, which this platform lacks")
+        with self._lock:
+            self._reactor_count = count
+    
+    def set_warm_connections(self, count: int) -> None:
+        """
+        Keep count connections to each backend opened ahead of clients, so a
+        new client skips the backend handshake. Each one is used by a single
+        client, then replaced. Off (0) by default, since backends that close
+        idle connections or serve one connection per thread see the spares
+        as load. Takes effect the next time the listener starts.
+        """
+        if count < 0:
+            raise ValueError(f"Invalid warm connection count: {count}")
+        with self._lock:
+            self._warm_connections = count
+    
     def _start_health_checker(self) -> None:
         """Start the health checker thread."""
         # Stop existing thread if any
@@ -244,187 +1000,297 @@ class LBManager:
             time.sleep(self._health_check_interval)
             
             try:
-                healthy_backends = 0
-                for backend in self._backends:
-                    is_healthy = self._check_backend_health(backend)
-                    if is_healthy:
-                        healthy_backends += 1
-                        
-                logger.info(f"Health check completed: {healthy_backends}/{len(self._backends)} healthy backends")
+                backends = self._backends
+                healthy_backends = self._check_backends(backends)
+                logger.info(f"Health check completed: {healthy_backends}/{len(backends)} healthy backends")
                 
                 # Record health check history
                 timestamp = datetime.now()
                 history_entry = {
                     "timestamp": timestamp,
                     "healthy_backends": healthy_backends,
-                    "total_backends": len(self._backends)
+                    "total_backends": len(backends)
                 }
                 
-                with self._lock:
+                with self._stats_lock:
+                    # The deque drops the oldest entry past 100
                     self._statistics["health_check_history"].append(history_entry)
-                    # Limit history to 100 entries
-                    if len(self._statistics["health_check_history"]) > 100:
-                        self._statistics["health_check_history"].pop(0)
+                    self._version += 1
+                    self._health_version += 1
                 
             except Exception as e:
                 logger.error(f"Error in health check loop: {e}")
     
-    def _check_backend_health(self, backend: BackendServer) -> bool:
-        """Check health of a single backend server."""
-        start_time = time.time()
-        is_healthy = False
+    def _check_backends(self, backends: Tuple[BackendServer, ...]) -> int:
+        """
+        TCP-check every backend at once: start a non-blocking connect to
+        each, then wait for them together, so a round takes at most one
+        timeout however many backends are down. Returns the healthy count.
+        """
+        start = time.monotonic()
+        deadline = start + self._health_check_timeout
+        results = [(False, None)] * len(backends)  # (connected, seconds taken)
+        selector = selectors.DefaultSelector()
         
         try:
-            # Simple TCP check
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(self._health_check_timeout)
-            
-            result = sock.connect_ex((backend.host, backend.port))
-            is_healthy = (result == 0)
+            for i, backend in enumerate(backends):
+                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                sock.setblocking(False)
+                try:
+                    err = sock.connect_ex(backend.sockaddr)
+                except OSError as e:
+                    # e.g. the host name does not resolve
+                    logger.error(f"Health check failed for {backend}: {e}")
+                    err = e.errno or errno.EHOSTUNREACH
+                
+                if err in (errno.EINPROGRESS, errno.EWOULDBLOCK):
+                    selector.register(sock, selectors.EVENT_WRITE, i)
+                else:
+                    results[i] = (err == 0, time.monotonic() - start)
+                    sock.close()
             
-            # Update backend status
-            backend.last_checked = datetime.now()
+            while selector.get_map():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                for key, _ in selector.select(remaining):
+                    sock = key.fileobj
+                    connected = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0
+                    results[key.data] = (connected, time.monotonic() - start)
+                    selector.unregister(sock)
+                    sock.close()
+        finally:
+            # Whatever is still registered timed out
+            for key in list(selector.get_map().values()):
+                key.fileobj.close()
+            selector.close()
+        
+        healthy_backends = 0
+        # One reading of each clock for the whole round
+        timed_out = time.monotonic() - start
+        checked_at = datetime.now()
+        for backend, (connected, elapsed) in zip(backends, results):
+            if elapsed is None:
+                elapsed = timed_out
+            healthy_backends += self._record_health(backend, connected, elapsed, checked_at)
+        return healthy_backends
+    
+    def _record_health(self, backend: BackendServer, is_healthy: bool, elapsed: float,
+                       checked_at: datetime) -> bool:
+        """Apply one check result to a backend's health state; returns whether it is healthy."""
+        backend.last_checked = checked_at
+        backend.response_time = int(elapsed * 1000)  # in ms
+        
+        if is_healthy:
+            backend.successful_checks += 1
+            backend.failed_checks = 0
             
-            if is_healthy:
-                # Reset failed checks if server becomes healthy
-                if not backend.healthy and backend.failed_checks >= self._unhealthy_threshold:
-                    if backend.failed_checks >= self._healthy_threshold:
-                        backend.healthy = True
-                        backend.failed_checks = 0
-                        logger.info(f"Backend {backend} is now HEALTHY")
-                else:
-                    backend.healthy = True
-                    backend.failed_checks = 0
-            else:
-                # Increment failed checks
-                backend.failed_checks += 1
-                
-                # Mark as unhealthy after threshold
-                if backend.healthy and backend.failed_checks >= self._unhealthy_threshold:
-                    backend.healthy = False
-                    logger.warning(f"Backend {backend} is now UNHEALTHY")
-                    
-        except Exception as e:
-            # Connection failure
-            logger.error(f"Health check failed for {backend}: {e}")
+            # Mark as healthy again after threshold
+            if not backend.healthy and backend.successful_checks >= self._healthy_threshold:
+                backend.healthy = True
+                self._health_changed()
+                logger.info(f"Backend {backend} is now HEALTHY")
+        else:
             backend.failed_checks += 1
+            backend.successful_checks = 0
             
+            # Mark as unhealthy after threshold
             if backend.healthy and backend.failed_checks >= self._unhealthy_threshold:
                 backend.healthy = False
+                self._health_changed()
                 logger.warning(f"Backend {backend} is now UNHEALTHY")
-                
-        finally:
-            # Record response time
-            end_time = time.time()
-            backend.response_time = int((end_time - start_time) * 1000)  # in ms
-            
-            try:
-                if 'sock' in locals():
-                    sock.close()
-            except:
-                pass
-                
+                # Its name may point somewhere else by now
+                self._re_resolve(backend)
+        
         return backend.healthy
     
-    def pick_backend(self) -> Tuple[str, int]:
-        """Pick a backend server using the current algorithm."""
-        with self._lock:
-            if not self._backends:
-                raise ValueError("No backends available")
-            
-            # Filter healthy backends
-            healthy_backends = [b for b in self._backends if b.healthy]
-            
-            if not healthy_backends:
-                logger.warning("No healthy backends available, using all backends")
-                healthy_backends = self._backends
-            
-            # Apply the selected algorithm
-            if self._algorithm == self.ROUND_ROBIN:
-                backend = self._pick_round_robin(healthy_backends)
-            elif self._algorithm == self.LEAST_CONNECTIONS:
-                backend = self._pick_least_connections(healthy_backends)
-            elif self._algorithm == self.WEIGHTED_ROUND_ROBIN:
-                backend = self._pick_weighted_round_robin(healthy_backends)
-            elif self._algorithm == self.RANDOM:
-                backend = self._pick_random(healthy_backends)
-            elif self._algorithm == self.IP_HASH:
-                # IP_HASH requires client IP which we don't have here
-                # Fallback to round robin
-                backend = self._pick_round_robin(healthy_backends)
-            else:
-                # Fallback to round robin
+    def _re_resolve(self, backend: BackendServer) -> None:
+        """Look a backend's name up again and point new connections at any new address."""
+        if backend.resolve():
+            # A single store; reactors read the dict without a lock
+            self._backend_sockaddrs[backend.address] = backend.sockaddr
+            logger.info(f"Backend {backend.host}:{backend.port} now resolves to {backend.sockaddr[0]}")
+    
+    def _health_changed(self) -> None:
+        """Note that a backend turned healthy or unhealthy, so picks see it."""
+        with self._stats_lock:
+            self._version += 1
+            self._backends_version += 1
+    
+    def pick_backend(self, client_ip: Optional[str] = None) -> Tuple[str, int]:
+        """
+        Pick a backend server using the current algorithm. IP_HASH needs the
+        client_ip and falls back to round-robin without it.
+        
+        Runs without the lock: the backend tuple is only ever replaced as a
+        whole, and the round-robin position comes from an itertools.count,
+        whose next() is atomic under the GIL. Reactors may pick concurrently,
+        so only the per-backend counters are updated under a small lock.
+        """
+        if not self._backends:
+            raise ValueError("No backends available")
+        
+        # Healthy backends, the weighted schedule and the hash ring only change with
+        # _backends_version, so they are rebuilt then, not on every pick
+        tables = self._pick_tables
+        if tables[0] != self._backends_version:
+            tables = self._build_pick_tables()
+        healthy_backends = tables[1]
+        
+        # Apply the selected algorithm
+        algorithm = self._algorithm
+        if algorithm == self.ROUND_ROBIN:
+            backend = self._pick_round_robin(healthy_backends)
+        elif algorithm == self.LEAST_CONNECTIONS:
+            backend = self._pick_least_connections(healthy_backends)
+        elif algorithm == self.WEIGHTED_ROUND_ROBIN:
+            backend = self._pick_weighted_round_robin(tables[2])
+        elif algorithm == self.RANDOM:
+            backend = self._pick_random(healthy_backends)
+        elif algorithm == self.IP_HASH and client_ip is not None:
+            backend = self._pick_ip_hash(tables[3], healthy_backends, client_ip)
+            if backend is None:
+                # No healthy backend to hash onto; spread clients over them all
                 backend = self._pick_round_robin(healthy_backends)
-            
-            # Update backend stats
+        else:
+            # Fallback to round robin
+            backend = self._pick_round_robin(healthy_backends)
+        
+        # Update backend stats
+        with self._backend_counts_lock:
             backend.total_connections += 1
             backend.active_connections += 1
-            
-            return backend.host, backend.port
+        
+        return backend.address
     
-    def _pick_round_robin(self, backends: List[BackendServer]) -> BackendServer:
+    def _pick_round_robin(self, backends: Tuple[BackendServer, ...]) -> BackendServer:
         """Round-robin backend selection."""
-        backend = backends[self._backend_index % len(backends)]
-        self._backend_index += 1
-        return backend
+        return backends[next(self._rr_counter) % len(backends)]
     
-    def _pick_least_connections(self, backends: List[BackendServer]) -> BackendServer:
+    def _pick_least_connections(self, backends: Tuple[BackendServer, ...]) -> BackendServer:
         """Select backend with least active connections."""
-        return min(backends, key=lambda b: b.active_connections)
-    
-    def _pick_weighted_round_robin(self, backends: List[BackendServer]) -> BackendServer:
-        """Weighted round-robin selection."""
-        # Create a list with backends repeated according to their weight
-        weighted_backends = []
-        for backend in backends:
-            weighted_backends.extend([backend] * backend.weight)
-            
-        if not weighted_backends:
-            return self._pick_round_robin(backends)
-            
-        index = self._backend_index % len(weighted_backends)
-        self._backend_index += 1
-        return weighted_backends[index]
+        return min(backends, key=_active_connections)
+    
+    def _build_pick_tables(self) -> Tuple[int, Tuple[BackendServer, ...], Tuple[BackendServer, ...], Tuple[List[int], List[BackendServer]]]:
+        """
+        Rebuild and publish (backends version, healthy backends, weighted
+        schedule, hash ring) for pick_backend. The version is read first, so
+        a change that lands mid-build makes the next pick rebuild again.
+        """
+        version = self._backends_version
+        backends = self._backends
+        healthy_backends = tuple(b for b in backends if b.healthy)
+        if not healthy_backends:
+            logger.warning("No healthy backends available, using all backends")
+            healthy_backends = backends
+        
+        # Each backend repeated according to its weight
+        schedule = tuple(backend for backend in healthy_backends for _ in range(backend.weight))
+        if not schedule:
+            schedule = healthy_backends
+        
+        # Hash ring: RING_POINTS points per unit of weight, keyed by address,
+        # so a backend joining or leaving only moves the clients next to its
+        # own points
+        points = sorted(
+            (_ring_hash(f"{backend.host}:{backend.port}#{i}"), backend)
+            for backend in healthy_backends
+            for i in range(self.RING_POINTS * max(backend.weight, 1))
+        )
+        ring = ([point for point, _ in points], [backend for _, backend in points])
+        
+        self._pick_tables = (version, healthy_backends, schedule, ring)
+        return self._pick_tables
+    
+    def _pick_weighted_round_robin(self, schedule: Tuple[BackendServer, ...]) -> BackendServer:
+        """Weighted round-robin selection over a schedule from _build_pick_tables."""
+        return schedule[next(self._rr_counter) % len(schedule)]
+    
+    def _pick_ip_hash(self, ring: Tuple[List[int], List[BackendServer]],
+                      backends: Tuple[BackendServer, ...], client_ip: str) -> Optional[BackendServer]:
+        """
+        Consistent hashing with bounded loads: a client goes to the owner of
+        the first ring point after its hash, unless that backend is unhealthy
+        or already has more than HASH_LOAD_FACTOR times the average load, in
+        which case the walk continues clockwise to the first healthy backend
+        under the bound. Returns None if no backend on the ring is healthy.
+        """
+        points, owners = ring
+        if not owners:
+            return None
+        total = sum(map(_active_connections, backends)) + 1  # Including this one
+        capacity = -(-total * self.HASH_LOAD_FACTOR // len(backends))  # Ceiling
+        start = bisect.bisect_right(points, _ring_hash(client_ip))
+        count = len(owners)
+        for i in range(start, start + count):
+            backend = owners[i % count]
+            if backend.healthy and backend.active_connections < capacity:
+                return backend
+        # Counters moved under us, or every backend went unhealthy
+        healthy_backends = tuple(backend for backend in backends if backend.healthy)
+        if not healthy_backends:
+            return None
+        return self._pick_least_connections(healthy_backends)
     
-    def _pick_random(self, backends: List[BackendServer]) -> BackendServer:
+    def _pick_random(self, backends: Tuple[BackendServer, ...]) -> BackendServer:
         """Random backend selection."""
         return random.choice(backends)
     
     def start_listener(self, listen_port: int, backends: List[str]) -> None:
         """Start the load balancer listener."""
+        # Parse "host:port" strings once, here, so a bad entry fails the
+        # start instead of every connection routed to it
+        servers = []
+        for backend_str in backends:
+            try:
+                host, port = backend_str.split(":")
+                port = int(port)
+            except ValueError:
+                raise ValueError(f"Invalid backend format: {backend_str}") from None
+            if not host or not 0 < port < 65536:
+                raise ValueError(f"Invalid backend format: {backend_str}")
+            servers.append(BackendServer(host, port))
+        
+        if not servers:
+            raise ValueError("No valid backends provided")
+        
+        # Resolve before taking the lock: a slow resolver must not stall
+        # the dashboard calls that take it meanwhile
+        for server in servers:
+            server.resolve()
+        
         with self._lock:
             if self._running:
                 raise RuntimeError("Load balancer is already running")
             
-            # Convert string backends to BackendServer objects
-            self._backends = []
-            for backend_str in backends:
-                try:
-                    host, port = backend_str.split(":")
-                    backend = BackendServer(host, int(port))
-                    self._backends.append(backend)
-                except ValueError:
-                    logger.error(f"Invalid backend format: {backend_str}")
-            
-            if not self._backends:
-                raise ValueError("No valid backends provided")
-                
-            self._backend_index = 0
+            # Publish with a single store so pick_backend never sees a partial list
+            self._backends = tuple(servers)
+            self._backend_by_addr = {backend.address: backend for backend in servers}
+            self._backend_sockaddrs = {backend.address: backend.sockaddr for backend in servers}
+            self._rr_counter = itertools.count()
             self._running = True
-            self._stop_event.clear()
+            # A fresh event per start, so reactor threads left over from an
+            # earlier run can only ever stop their own
+            stop_event = self._stop_event = threading.Event()
             self._statistics["start_time"] = datetime.now()
+            self._start_ns = time.monotonic_ns()
+            self._version += 1
+            self._backends_version += 1
             
             # Start health checker if enabled
             if self._enable_health_checks:
                 self._start_health_checker()
             
-            # Start listener thread
-            self._listener_thread = threading.Thread(
-                target=self._listener_loop, 
-                args=(listen_port,),
-                daemon=True
-            )
-            self._listener_thread.start()
+            # Start the reactor threads; with more than one, each binds its
+            # own socket to the port and the kernel balances between them
+            reuse_port = self._reactor_count > 1
+            self._listener_threads = [
+                threading.Thread(target=self._listener_loop, args=(listen_port, stop_event, reuse_port),
+                                 daemon=True)
+                for _ in range(self._reactor_count)
+            ]
+            for thread in self._listener_threads:
+                thread.start()
             logger.info(f"Load balancer listening on port {listen_port} with {len(self._backends)} backends")
     
     def stop_listener(self) -> None:
@@ -436,132 +1302,68 @@ class LBManager:
             logger.info("Stopping load balancer...")
             self._stop_event.set()
             self._running = False
-            
-            # Wait for the listener thread to finish
-            if self._listener_thread and self._listener_thread.is_alive():
-                self._listener_thread.join(timeout=2.0)
-            
-            # Close all active connections
-            for conn_id in list(self._active_conns.keys()):
-                self.remove_connection(conn_id)
+            self._version += 1
+            listener_threads = self._listener_threads
+        
+        self._wake_reactors()
+        
+        # Wait for the reactors to close their connections
+        deadline = time.monotonic() + 2.0
+        for thread in listener_threads:
+            thread.join(timeout=max(0.0, deadline - time.monotonic()))
+        
+        # Drop anything the reactors did not get to
+        for conn in self.list_connections():
+            self.remove_connection(conn.id)
+    
+    def _wake_reactors(self) -> None:
+        """Wake every running reactor so it notices the stop event now."""
+        with self._stats_lock:
+            reactors = list(self._reactors)
+        for reactor in reactors:
+            reactor.wake()
     
     def is_running(self) -> bool:
         """Check if the load balancer is running."""
         with self._lock:
             return self._running
     
-    def _listener_loop(self, listen_port: int) -> None:
-        """Main listener loop to accept connections."""
+    def _listener_loop(self, listen_port: int, stop_event: threading.Event, reuse_port: bool = False) -> None:
+        """Accept and proxy connections on one reactor thread until stop_event is set."""
         try:
             server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            if reuse_port:
+                server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
             server_socket.bind(('0.0.0.0', listen_port))
-            server_socket.settimeout(0.5)  # Set timeout for accept() to allow checking stop_event
-            server_socket.listen(5)
+            server_socket.listen(self.LISTEN_BACKLOG)
             
-            while not self._stop_event.is_set():
-                try:
-                    client_sock, addr = server_socket.accept()
-                    # Handle each client in a separate thread
-                    client_thread = threading.Thread(
-                        target=self._handle_client,
-                        args=(client_sock, addr),
-                        daemon=True
-                    )
-                    client_thread.start()
-                except socket.timeout:
-                    continue
-                except Exception as e:
-                    logger.error(f"Error accepting connection: {e}")
+            reactor = _Reactor(self, server_socket,
+                               warm_connections=self._warm_connections,
+                               backend_sockaddrs=self._backend_sockaddrs)
+            with self._stats_lock:
+                self._reactors.append(reactor)
+            try:
+                reactor.run(stop_event)
+            finally:
+                # Fold the totals in and retire the reactor in one step, so
+                # readers never count its bytes twice
+                with self._stats_lock:
+                    self._statistics["bytes_sent"] += reactor.bytes_sent
+                    self._statistics["bytes_received"] += reactor.bytes_received
+                    self._reactors.remove(reactor)
             
         except Exception as e:
             logger.error(f"Error in listener loop: {e}")
         finally:
             if 'server_socket' in locals():
                 server_socket.close()
-            self._running = False
-    
-    def _handle_client(self, client_sock: socket.socket, addr: Tuple[str, int]) -> None:
-        """Handle a client connection."""
-        conn_id = str(uuid.uuid4())
-        source = f"{addr[0]}:{addr[1]}"
-        
-        try:
-            # Pick a backend
-            host, port = self.pick_backend()
-            destination = f"{host}:{port}"
-            
-            # Connect to the backend
-            backend_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            backend_sock.connect((host, int(port)))
-            
-            # Create connection info
-            conn_info = ConnectionInfo(
-                conn_id=conn_id,
-                source=source,
-                destination=destination,
-                start_time=datetime.now()
-            )
-            self.add_connection(conn_info)
-            
-            # Set up communication threads
-            client_to_backend = threading.Thread(
-                target=self._forward_data,
-                args=(client_sock, backend_sock, conn_info, True),
-                daemon=True
-            )
-            backend_to_client = threading.Thread(
-                target=self._forward_data,
-                args=(backend_sock, client_sock, conn_info, False),
-                daemon=True
-            )
-            
-            client_to_backend.start()
-            backend_to_client.start()
-            
-            # Wait for both threads to complete
-            client_to_backend.join()
-            backend_to_client.join()
-            
-        except Exception as e:
-            logger.error(f"Error handling client {conn_id}: {e}")
-        finally:
-            # Clean up
-            self.remove_connection(conn_id)
-            try:
-                client_sock.close()
-            except:
-                pass
-            try:
-                if 'backend_sock' in locals():
-                    backend_sock.close()
-            except:
-                pass
-    
-    def _forward_data(self, src: socket.socket, dst: socket.socket, conn: ConnectionInfo, client_to_backend: bool) -> None:
-        """Forward data between source and destination sockets."""
-        try:
-            buffer_size = 8192
-            src.settimeout(60.0)  # 60 second timeout
-            
-            while not self._stop_event.is_set():
-                try:
-                    data = src.recv(buffer_size)
-                    if not data:
-                        break
-                    
-                    dst.sendall(data)
-                    
-                    # Update statistics
-                    if client_to_backend:
-                        conn.bytes_sent += len(data)
-                    else:
-                        conn.bytes_received += len(data)
-                    
-                except socket.timeout:
-                    continue
-                except Exception as e:
-                    logger.error(f"Error forwarding data: {e}")
-                    break
-        except Exception as e:
-            logger.error(f"Error in forward loop: {e}")
+            # One reactor exiting (on stop, or on an error such as a failed
+            # bind) takes the others of its run down with it, and the run
+            # ends unless a later start has replaced it already
+            stop_event.set()
+            self._wake_reactors()
+            with self._lock:
+                if self._stop_event is stop_event and self._running:
+                    self._running = False
+                    self._version += 1
@@ -0,0 +1,120 @@
+"""
+Time series storage and collector timing shared by the analytics and
+statistics collectors.
+"""
+
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Tuple
+
+import numpy as np
+
+class Series:
+    """
+    Time series stored column-wise: a datetime64 "timestamp" column plus
+    one NumPy array per field, grown a chunk at a time. Once more than
+    max_entries are stored, the oldest chunk is dropped by copying the
+    rest into new arrays.
+    
+    There must be a single writer (the collectors append under their
+    lock), but readers need no lock: the writer only fills rows past the
+    published size, and publishes (columns, size) as one tuple, which
+    readers take with a single attribute load.
+    """
+    
+    CHUNK = 1024  # Rows added (and dropped) at a time
+    
+    def __init__(self, fields: Dict[str, Any], max_entries: int):
+        self._dtypes = {"timestamp": "datetime64[us]", **fields}
+        self.max_entries = max_entries
+        self._state = ({name: np.empty(self.CHUNK, dtype=dtype) for name, dtype in self._dtypes.items()}, 0)
+        self.appended = 0  # Rows ever added, dropped ones included
+        self.record_dtype = np.dtype(list(self._dtypes.items()))
+    
+    def __len__(self) -> int:
+        return self._state[1]
+    
+    def append(self, timestamp: datetime, **values: Any) -> None:
+        """Add one row; values are keyed by field name."""
+        columns, size = self._state
+        if size == len(columns["timestamp"]):
+            columns, size = self._make_room(columns, size)
+        
+        columns["timestamp"][size] = timestamp
+        for name, value in values.items():
+            columns[name][size] = value
+        self._state = (columns, size + 1)
+        self.appended += 1
+    
+    def _make_room(self, columns: Dict[str, np.ndarray], size: int) -> Tuple[Dict[str, np.ndarray], int]:
+        """
+        New arrays with room for another row: drop rows past max_entries
+        once a chunk has piled up, otherwise grow.
+        """
+        capacity = len(columns["timestamp"])
+        limit = self.max_entries + self.CHUNK
+        keep = self.max_entries if capacity >= limit else size
+        grown = {}
+        for name, column in columns.items():
+            grown[name] = np.empty(min(capacity + self.CHUNK, limit), dtype=column.dtype)
+            grown[name][:keep] = column[size - keep:size]
+        return grown, keep
+    
+    def since(self, cutoff: np.datetime64) -> Dict[str, np.ndarray]:
+        """Copies of every column, limited to rows newer than cutoff."""
+        columns, size = self._state
+        # Rows are appended in time order, so the cutoff is a binary search away
+        start = np.searchsorted(columns["timestamp"][:size], cutoff, side="right")
+        return {name: column[start:size].copy() for name, column in columns.items()}
+    
+    def records(self, after: int = 0) -> np.ndarray:
+        """
+        Rows added after the first `after` ever appended, as a structured
+        array of record_dtype (rows already dropped are skipped). Call
+        from the writer, or with its lock held.
+        """
+        columns, size = self._state
+        count = min(self.appended - after, size)
+        records = np.empty(count, dtype=self.record_dtype)
+        for name, column in columns.items():
+            records[name] = column[size - count:size]
+        return records
+    
+    def extend(self, new_rows: Dict[str, np.ndarray]) -> None:
+        """
+        Add many rows at once, given one array per column (timestamp
+        included) or a structured array of record_dtype.
+        """
+        columns, size = self._state
+        merged = {
+            name: np.concatenate([column[:size], np.asarray(new_rows[name], dtype=column.dtype)])[-self.max_entries:]
+            for name, column in columns.items()
+        }
+        size = len(merged["timestamp"])
+        capacity = max(size, self.CHUNK)
+        extended = {}
+        for name, values in merged.items():
+            extended[name] = np.empty(capacity, dtype=values.dtype)
+            extended[name][:size] = values
+        self._state = (extended, size)
+        self.appended += len(new_rows["timestamp"])
+
+def cutoff_time(timespan: int) -> np.datetime64:
+    """The timestamp timespan seconds ago, in the resolution series are stored at."""
+    return np.datetime64(datetime.now(), "us") - np.timedelta64(timespan, "s")
+
+def wait_for_tick(stop_event: threading.Event, next_tick: float, interval: float) -> float:
+    """
+    Wait for the next tick on a fixed cadence, however long the current one
+    took, and return it for the following call; start from time.monotonic().
+    Setting stop_event wakes the wait at once.
+    """
+    next_tick += interval
+    delay = next_tick - time.monotonic()
+    if delay < 0:
+        # Fell behind; restart the cadence rather than burst to catch up
+        next_tick -= delay
+        delay = 0
+    stop_event.wait(delay)
+    return next_tick
@@ -5,28 +5,45 @@ Statistics collection and visualization for the load balancer.
 import pandas as pd
 import numpy as np
 import plotly.graph_objs as go
-from datetime import datetime, timedelta
+from datetime import datetime
 import time
 import threading
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from .core import LBManager
+from .series import Series, cutoff_time, wait_for_tick
 
 class StatsCollector:
     """Collect and process statistics from the load balancer."""
     
+    MAX_POINTS = 3600  # Keep at most 1 hour of 1-second data
+    MAX_IDLE_TICKS = 10  # Unchanged samples skipped in a row before one is recorded anyway
+    
     def __init__(self, lb_manager: LBManager):
         self.lb_manager = lb_manager
-        self._lock = threading.RLock()
-        self._time_series = {
-            "timestamps": [],
-            "active_connections": [],
-            "bytes_sent": [],
-            "bytes_received": [],
-        }
+        self._lock = threading.Lock()  # Guards start/stop and appends; readers need no lock
+        self._time_series = Series({
+            "active_connections": np.int64,
+            "bytes_sent": np.int64,
+            "bytes_received": np.int64,
+        }, self.MAX_POINTS)
         self._running = False
         self._thread = None
         self._stop_event = threading.Event()
         self._interval = 1.0  # collection interval in seconds
+        
+        # Built once; each plot call only swaps in new trace data, which
+        # skips rebuilding and revalidating the traces and layout
+        self._fig_lock = threading.Lock()
+        self._connections_fig = self._figure("Active Connections", "Connections", [
+            go.Scattergl(x=[], y=[], mode='lines', name='Active Connections',
+                         line=dict(color='#1f77b4', width=2))
+        ])
+        self._throughput_fig = self._figure("Throughput", "Bytes/s", [
+            go.Scattergl(x=[], y=[], mode='lines', name='Bytes Sent/s',
+                         line=dict(color='#2ca02c', width=2)),
+            go.Scattergl(x=[], y=[], mode='lines', name='Bytes Received/s',
+                         line=dict(color='#d62728', width=2))
+        ])
     
     def start(self, interval: float = 1.0) -> None:
         """Start collecting statistics."""
@@ -52,166 +69,117 @@ class StatsCollector:
             
             self._stop_event.set()
             self._running = False
-            
-            if self._thread and self._thread.is_alive():
-                self._thread.join(timeout=2.0)
+            thread = self._thread
+        
+        # Join outside the lock, which the collector thread takes to append
+        if thread and thread.is_alive():
+            thread.join(timeout=2.0)
     
     def is_running(self) -> bool:
         """Check if the collector is running."""
-        with self._lock:
-            return self._running
+        return self._running
     
-    def get_time_series(self, timespan: int = 60) -> Dict[str, List]:
-        """Get time series data for plotting."""
-        with self._lock:
-            if not self._time_series["timestamps"]:
-                return {
-                    "timestamps": [],
-                    "active_connections": [],
-                    "bytes_sent": [],
-                    "bytes_received": [],
-                }
-            
-            # Filter to the requested timespan
-            now = datetime.now()
-            cutoff = now - timedelta(seconds=timespan)
-            
-            # Find the index of the first element to include
-            start_idx = 0
-            for i, ts in enumerate(self._time_series["timestamps"]):
-                if ts >= cutoff:
-                    start_idx = i
-                    break
-            
-            return {
-                "timestamps": self._time_series["timestamps"][start_idx:],
-                "active_connections": self._time_series["active_connections"][start_idx:],
-                "bytes_sent": self._time_series["bytes_sent"][start_idx:],
-                "bytes_received": self._time_series["bytes_received"][start_idx:],
-            }
+    def get_time_series(self, timespan: int = 60) -> Dict[str, np.ndarray]:
+        """
+        Get time series data for plotting, one array per column. Runs
+        without the lock: the series publishes each append atomically.
+        """
+        series = self._time_series.since(cutoff_time(timespan))
+        series["timestamps"] = series.pop("timestamp")
+        return series
     
-    def plot_connections(self, timespan: int = 60) -> go.Figure:
-        """Create a plot of active connections over time."""
-        ts_data = self.get_time_series(timespan)
-        
-        if not ts_data["timestamps"]:
-            # Return an empty figure
-            fig = go.Figure()
-            fig.update_layout(
-                title="Active Connections",
-                xaxis_title="Time",
-                yaxis_title="Connections",
-                height=300,
-                margin=dict(l=10, r=10, t=40, b=20)
-            )
-            return fig
-        
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=ts_data["timestamps"],
-            y=ts_data["active_connections"],
-            mode='lines',
-            name='Active Connections',
-            line=dict(color='#1f77b4', width=2)
-        ))
-        
+    @staticmethod
+    def _figure(title: str, yaxis_title: str, traces: List[go.Scattergl]) -> go.Figure:
+        """Build a time-series figure with the layout shared by both plots."""
+        fig = go.Figure(data=traces)
         fig.update_layout(
-            title="Active Connections",
+            title=title,
             xaxis_title="Time",
-            yaxis_title="Connections",
+            yaxis_title=yaxis_title,
             height=300,
             margin=dict(l=10, r=10, t=40, b=20)
         )
-        
         return fig
     
-    def plot_throughput(self, timespan: int = 60) -> go.Figure:
-        """Create a plot of throughput over time."""
+    def plot_connections(self, timespan: int = 60) -> Dict[str, Any]:
+        """
+        Create a plot of active connections over time, as a figure dict.
+        The dict is a snapshot, safe to render while other calls update
+        the cached figure it was taken from.
+        """
         ts_data = self.get_time_series(timespan)
         
-        if not ts_data["timestamps"]:
-            # Return an empty figure
-            fig = go.Figure()
-            fig.update_layout(
-                title="Throughput",
-                xaxis_title="Time",
-                yaxis_title="Bytes/s",
-                height=300,
-                margin=dict(l=10, r=10, t=40, b=20)
-            )
-            return fig
+        with self._fig_lock:
+            fig = self._connections_fig
+            fig.data[0].update(x=ts_data["timestamps"], y=ts_data["active_connections"])
+            return fig.to_dict()
+    
+    def plot_throughput(self, timespan: int = 60) -> Dict[str, Any]:
+        """
+        Create a plot of throughput over time, as a figure dict. The dict
+        is a snapshot, safe to render while other calls update the cached
+        figure it was taken from.
+        """
+        ts_data = self.get_time_series(timespan)
         
         # Convert cumulative bytes to bytes/s
-        bytes_sent_rate = []
-        bytes_received_rate = []
-        
-        for i in range(1, len(ts_data["timestamps"])):
-            # Calculate time difference
-            dt = (ts_data["timestamps"][i] - ts_data["timestamps"][i-1]).total_seconds()
-            if dt <= 0:
-                dt = 1.0  # Avoid division by zero
-            
-            # Calculate byte rate
-            sent_rate = (ts_data["bytes_sent"][i] - ts_data["bytes_sent"][i-1]) / dt
-            recv_rate = (ts_data["bytes_received"][i] - ts_data["bytes_received"][i-1]) / dt
-            
-            bytes_sent_rate.append(sent_rate)
-            bytes_received_rate.append(recv_rate)
+        dt = np.diff(ts_data["timestamps"]) / np.timedelta64(1, "s")
+        dt[dt <= 0] = 1.0  # Avoid division by zero
+        bytes_sent_rate = np.diff(ts_data["bytes_sent"]) / dt
+        bytes_received_rate = np.diff(ts_data["bytes_received"]) / dt
         
         # Skip the first timestamp since we can't calculate a rate for it
         plot_times = ts_data["timestamps"][1:]
         
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=plot_times,
-            y=bytes_sent_rate,
-            mode='lines',
-            name='Bytes Sent/s',
-            line=dict(color='#2ca02c', width=2)
-        ))
-        fig.add_trace(go.Scatter(
-            x=plot_times,
-            y=bytes_received_rate,
-            mode='lines',
-            name='Bytes Received/s',
-            line=dict(color='#d62728', width=2)
-        ))
-        
-        fig.update_layout(
-            title="Throughput",
-            xaxis_title="Time",
-            yaxis_title="Bytes/s",
-            height=300,
-            margin=dict(l=10, r=10, t=40, b=20)
+        with self._fig_lock:
+            fig = self._throughput_fig
+            with fig.batch_update():
+                fig.data[0].update(x=plot_times, y=bytes_sent_rate)
+                fig.data[1].update(x=plot_times, y=bytes_received_rate)
+            return fig.to_dict()
+    
+    def _append(self, timestamp: datetime, values: Tuple[int, int, int]) -> None:
+        """Record one (active_connections, bytes_sent, bytes_received) sample."""
+        active_connections, bytes_sent, bytes_received = values
+        self._time_series.append(
+            timestamp,
+            active_connections=active_connections,
+            bytes_sent=bytes_sent,
+            bytes_received=bytes_received
         )
-        
-        return fig
     
     def _collector_loop(self) -> None:
         """Background thread to collect statistics."""
+        next_tick = time.monotonic()
+        last_values = None  # (active_connections, bytes_sent, bytes_received) last recorded
+        idle_ticks = 0  # Samples skipped since, because nothing had changed
+        idle_time = None  # When the last skipped sample was taken
+        
         while not self._stop_event.is_set():
             try:
                 if self.lb_manager.is_running():
-                    with self._lock:
-                        # Get current stats
-                        stats = self.lb_manager.get_statistics()
-                        
-                        # Record time series
-                        now = datetime.now()
-                        self._time_series["timestamps"].append(now)
-                        self._time_series["active_connections"].append(stats["active_connections"])
-                        self._time_series["bytes_sent"].append(stats["bytes_sent"])
-                        self._time_series["bytes_received"].append(stats["bytes_received"])
-                        
-                        # Limit the size of our time series to avoid memory growth
-                        max_points = 3600  # Keep at most 1 hour of 1-second data
-                        if len(self._time_series["timestamps"]) > max_points:
-                            self._time_series["timestamps"] = self._time_series["timestamps"][-max_points:]
-                            self._time_series["active_connections"] = self._time_series["active_connections"][-max_points:]
-                            self._time_series["bytes_sent"] = self._time_series["bytes_sent"][-max_points:]
-                            self._time_series["bytes_received"] = self._time_series["bytes_received"][-max_points:]
+                    # Get current stats before taking the lock, which only
+                    # needs to cover the append
+                    stats = self.lb_manager.get_counters()
+                    now = datetime.now()
+                    values = (stats["active_connections"], stats["bytes_sent"], stats["bytes_received"])
+                    
+                    if values == last_values and idle_ticks < self.MAX_IDLE_TICKS:
+                        # Idle: skip the sample, but still record one every
+                        # MAX_IDLE_TICKS so the timeline keeps moving
+                        idle_ticks += 1
+                        idle_time = now
+                    else:
+                        with self._lock:
+                            # Close an idle run at its last skipped sample, so
+                            # lines stay flat across it and rates read zero
+                            if idle_ticks and values != last_values:
+                                self._append(idle_time, last_values)
+                            # Record time series; the series drops rows past MAX_POINTS
+                            self._append(now, values)
+                        last_values = values
+                        idle_ticks = 0
             except Exception as e:
                 print(f"Error in stats collector: {e}")
             
-            # Wait for the next collection interval
-            time.sleep(self._interval)
+            next_tick = wait_for_tick(self._stop_event, next_tick, self._interval)
@@ -7,7 +7,7 @@ import socket
 import logging
 import threading
 import time
-import queue
+import collections
 from enum import Enum
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
@@ -33,47 +33,64 @@ class LogLevel(Enum):
     @staticmethod
     def from_string(level_str: str) -> 'LogLevel':
         """Convert string level to enum."""
-        mapping = {
-            "debug": LogLevel.DEBUG,
-            "informational": LogLevel.INFO,
-            "notice": LogLevel.NOTICE,
-            "warning": LogLevel.WARNING,
-            "error": LogLevel.ERROR,
-            "critical": LogLevel.CRITICAL,
-            "alert": LogLevel.ALERT,
-            "emergency": LogLevel.EMERGENCY
-        }
-        return mapping.get(level_str.lower(), LogLevel.INFO)
+        return _LEVEL_FROM_STRING.get(level_str.lower(), LogLevel.INFO)
     
     @property
     def description(self) -> str:
         """Get description for UI display."""
-        descriptions = {
-            LogLevel.DEBUG: "Debug - Detailed debugging information",
-            LogLevel.INFO: "Informational - Normal operational messages",
-            LogLevel.NOTICE: "Notice - Normal but significant events",
-            LogLevel.WARNING: "Warning - Potential issues that aren't errors",
-            LogLevel.ERROR: "Error - Error conditions",
-            LogLevel.CRITICAL: "Critical - Critical conditions",
-            LogLevel.ALERT: "Alert - Immediate action required",
-            LogLevel.EMERGENCY: "Emergency - System is unusable"
-        }
-        return descriptions[self]
+        return _LEVEL_DESCRIPTIONS[self]
+
+# Lookup tables for LogLevel, built once rather than on every call
+_LEVEL_FROM_STRING = {
+    "debug": LogLevel.DEBUG,
+    "informational": LogLevel.INFO,
+    "notice": LogLevel.NOTICE,
+    "warning": LogLevel.WARNING,
+    "error": LogLevel.ERROR,
+    "critical": LogLevel.CRITICAL,
+    "alert": LogLevel.ALERT,
+    "emergency": LogLevel.EMERGENCY
+}
+
+_LEVEL_DESCRIPTIONS = {
+    LogLevel.DEBUG: "Debug - Detailed debugging information",
+    LogLevel.INFO: "Informational - Normal operational messages",
+    LogLevel.NOTICE: "Notice - Normal but significant events",
+    LogLevel.WARNING: "Warning - Potential issues that aren't errors",
+    LogLevel.ERROR: "Error - Error conditions",
+    LogLevel.CRITICAL: "Critical - Critical conditions",
+    LogLevel.ALERT: "Alert - Immediate action required",
+    LogLevel.EMERGENCY: "Emergency - System is unusable"
+}
 
 class SyslogForwarder:
     """Handles forwarding logs to external syslog servers."""
     
+    SEND_BATCH = 256  # Most queued messages sent per wakeup of the sender thread
+    MAX_QUEUED = 10000  # Messages waiting for the sender; the oldest are dropped past this
+    SEND_TIMEOUT = 5.0  # Seconds a TCP connect or send may block the sender
+    RETRY_MIN = 0.5  # Seconds before the first TCP reconnect attempt
+    RETRY_MAX = 30.0  # Longest wait between TCP reconnect attempts
+    
     def __init__(self):
         self._enabled = False
         self._host = "127.0.0.1"
         self._port = 1514
         self._protocol = "udp"  # "tcp" or "udp"
         self._min_level = LogLevel.WARNING  # Default to WARNING level
+        self._min_level_value = self._min_level.value  # Read by forward() without the lock
         self._facility = 16  # local0
         self._hostname = socket.gethostname()
         self._app_name = "loadbalancer"
-        self._lock = threading.RLock()
-        self._log_queue = queue.Queue()
+        # Encoded once: the <PRI> for each level and the fields after the timestamp
+        self._pri_bytes = {level: f"<{self._facility * 8 + level.value}>".encode() for level in LogLevel}
+        self._header_bytes = f" {self._hostname} {self._app_name} - - - ".encode()
+        self._lock = threading.Lock()  # Guards configuration and the worker thread
+        # Appends and pops on a deque are atomic, so producers only touch
+        # the event when the sender may be asleep
+        self._log_queue = collections.deque(maxlen=self.MAX_QUEUED)
+        self._log_ready = threading.Event()  # Set when messages are queued, or to stop
+        self._dropped = 0  # Messages dropped by a full queue or a failed send (approximate)
         self._worker_thread = None
         self._stop_event = threading.Event()
         
@@ -81,9 +98,12 @@ class SyslogForwarder:
         """Start the syslog forwarder."""
         with self._lock:
             if self._enabled and not self._worker_thread:
-                self._stop_event.clear()
+                # Each run gets its own stop event and destination, so a sender
+                # that outlives stop()'s join never carries on into a later run
+                self._stop_event = threading.Event()
                 self._worker_thread = threading.Thread(
                     target=self._log_sender_loop,
+                    args=(self._stop_event, (self._host, self._port), self._protocol),
                     daemon=True
                 )
                 self._worker_thread.start()
@@ -94,6 +114,7 @@ class SyslogForwarder:
         with self._lock:
             if self._worker_thread:
                 self._stop_event.set()
+                self._log_ready.set()
                 self._worker_thread.join(timeout=2.0)
                 self._worker_thread = None
                 logger.info("Syslog forwarder stopped")
@@ -104,25 +125,28 @@ class SyslogForwarder:
         """Configure the syslog forwarder."""
         with self._lock:
             was_enabled = self._enabled
+            moved = (host, port, protocol.lower()) != (self._host, self._port, self._protocol)
             
             self._enabled = enabled
             self._host = host
             self._port = port
             self._protocol = protocol.lower()
             self._min_level = min_level
-            
-            # If enabled status changed, start or stop accordingly
-            if was_enabled and not self._enabled:
-                self.stop()
-            elif not was_enabled and self._enabled:
-                self.start()
-            
-            logger.info(f"Syslog forwarder configured: enabled={enabled}, host={host}, port={port}, protocol={protocol}, min_level={min_level.name}")
+            self._min_level_value = min_level.value
+        
+        # If enabled status changed, start or stop accordingly. The sender's
+        # socket is made for one destination, so a new one means a restart
+        if was_enabled and not enabled:
+            self.stop()
+        elif enabled and (not was_enabled or moved):
+            self.stop()
+            self.start()
+        
+        logger.info(f"Syslog forwarder configured: enabled={enabled}, host={host}, port={port}, protocol={protocol}, min_level={min_level.name}")
     
     def is_enabled(self) -> bool:
         """Check if forwarding is enabled."""
-        with self._lock:
-            return self._enabled
+        return self._enabled
     
     def get_config(self) -> Dict:
         """Get current configuration."""
@@ -133,61 +157,120 @@ class SyslogForwarder:
                 "port": self._port,
                 "protocol": self._protocol,
                 "min_level": self._min_level.name,
-                "min_level_value": self._min_level.value
+                "min_level_value": self._min_level.value,
+                "dropped": self._dropped
             }
     
+    def accepts(self, level: LogLevel) -> bool:
+        """Whether forward() would pass on a message at this level."""
+        return self._enabled and level.value <= self._min_level_value
+    
     def forward(self, level: LogLevel, message: str) -> None:
-        """Forward a log message if it meets the minimum level."""
-        with self._lock:
-            if not self._enabled or level.value > self._min_level.value:
-                return
-            
-            self._log_queue.put((level, message))
+        """
+        Forward a log message if it meets the minimum level. Runs without
+        the lock: both fields it checks are replaced by single stores, and
+        the queue is thread-safe on its own. Never blocks: if the server is
+        slow or down, the oldest queued messages make way.
+        """
+        if not self._enabled or level.value > self._min_level_value:
+            return
+        
+        log_queue = self._log_queue
+        if len(log_queue) == self.MAX_QUEUED:
+            self._dropped += 1
+        log_queue.append((level, message))
+        if not self._log_ready.is_set():
+            self._log_ready.set()
     
-    def _log_sender_loop(self) -> None:
-        """Background thread for sending logs."""
+    def _format_into(self, buf: bytearray, timestamp: bytes, level: LogLevel, message: str) -> None:
+        """Append a syslog message, formatted according to RFC 5424, to buf."""
+        buf += self._pri_bytes[level]
+        buf += timestamp
+        buf += self._header_bytes
+        buf += message.encode()
+    
+    def _connect(self, address: Tuple[str, int]) -> socket.socket:
+        """Open a TCP connection to the syslog server."""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            # Bound connect and sendall, so a stalled server cannot wedge the sender
+            sock.settimeout(self.SEND_TIMEOUT)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            sock.connect(address)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+    
+    def _log_sender_loop(self, stop_event: threading.Event, address: Tuple[str, int], protocol: str) -> None:
+        """Background thread for sending logs to address over protocol."""
         sock = None
+        retry_at = 0.0  # time.monotonic() of the next TCP connect attempt
+        backoff = self.RETRY_MIN  # Wait after the next failed attempt
+        buf = bytearray()  # Reused for every message or batch; keeps its capacity
         try:
-            if self._protocol == "udp":
+            if protocol == "udp":
                 sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            else:  # tcp
-                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                sock.connect((self._host, self._port))
             
-            while not self._stop_event.is_set():
-                try:
-                    # Get a log message from the queue with timeout
+            while not stop_event.is_set():
+                # (Re)connect over TCP, backing off exponentially while the
+                # server is unreachable; messages wait in the queue meanwhile
+                if sock is None:
+                    delay = retry_at - time.monotonic()
+                    if delay > 0:
+                        stop_event.wait(delay)
+                        continue
                     try:
-                        level, message = self._log_queue.get(timeout=1.0)
-                    except queue.Empty:
+                        sock = self._connect(address)
+                    except OSError as e:
+                        logger.error(f"Failed to connect to syslog server: {e}")
+                        retry_at = time.monotonic() + backoff
+                        backoff = min(backoff * 2, self.RETRY_MAX)
                         continue
-                    
-                    # Format syslog message according to RFC 5424
-                    timestamp = datetime.now().strftime("%Y-%m-%dT%H:%M:%S.%fZ")
-                    pri = (self._facility * 8) + level.value
-                    syslog_msg = f"<{pri}>{timestamp} {self._hostname} {self._app_name} - - - {message}"
-                    
-                    # Send the message
-                    if self._protocol == "udp":
-                        sock.sendto(syslog_msg.encode(), (self._host, self._port))
+                
+                # Wait for log messages, then take up to a batch of them.
+                # Clearing before draining means a message queued after the
+                # drain sets the event again and is not missed
+                if not self._log_queue:
+                    self._log_ready.wait()
+                    self._log_ready.clear()
+                    continue
+                batch = []
+                try:
+                    while len(batch) < self.SEND_BATCH:
+                        batch.append(self._log_queue.popleft())
+                except IndexError:
+                    pass
+                
+                # One timestamp for the batch; it records when it was sent
+                timestamp = datetime.now().isoformat(timespec="microseconds").encode() + b"Z"
+                
+                sent = 0
+                try:
+                    # Datagrams go one per message; a stream takes the whole
+                    # batch, newline-delimited, in one write
+                    if protocol == "udp":
+                        for level, message in batch:
+                            buf.clear()
+                            self._format_into(buf, timestamp, level, message)
+                            sock.sendto(buf, address)
+                            sent += 1
                     else:  # tcp
-                        sock.sendall(syslog_msg.encode() + b'\n')
-                    
-                    # Mark task as done
-                    self._log_queue.task_done()
-                    
-                except Exception as e:
+                        buf.clear()
+                        for level, message in batch:
+                            self._format_into(buf, timestamp, level, message)
+                            buf += b'\n'
+                        sock.sendall(buf)
+                        backoff = self.RETRY_MIN
+                except OSError as e:
                     logger.error(f"Error sending syslog message: {e}")
-                    
-                    # Try to reconnect if using TCP and connection lost
-                    if self._protocol == "tcp" and isinstance(e, (ConnectionRefusedError, BrokenPipeError)):
-                        try:
-                            sock.close()
-                            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                            sock.connect((self._host, self._port))
-                        except Exception as connect_err:
-                            logger.error(f"Failed to reconnect to syslog server: {connect_err}")
-                            time.sleep(5)  # Wait before retry
+                    # The rest of the batch goes with the failed send
+                    self._dropped += len(batch) - sent
+                    if protocol == "tcp":
+                        # The connection is gone; reconnect for the next batch
+                        sock.close()
+                        sock = None
                 
         except Exception as e:
             logger.error(f"Error in syslog sender: {e}")
@@ -198,30 +281,38 @@ class SyslogForwarder:
                 except:
                     pass
 
-# Global instance
-syslog_forwarder = SyslogForwarder()
-
-def log_debug(message: str) -> None:
-    """Log a debug message."""
-    logger.debug(message)
-    syslog_forwarder.forward(LogLevel.DEBUG, message)
-
-def log_info(message: str) -> None:
-    """Log an info message."""
-    logger.info(message)
-    syslog_forwarder.forward(LogLevel.INFO, message)
-
-def log_warning(message: str) -> None:
-    """Log a warning message."""
-    logger.warning(message)
-    syslog_forwarder.forward(LogLevel.WARNING, message)
+class SyslogHandler(logging.Handler):
+    """
+    Logging handler that passes records to a SyslogForwarder, so anything
+    logged under the "loadbalancer" logger can reach the syslog server.
+    """
+    
+    def __init__(self, forwarder: SyslogForwarder):
+        super().__init__()
+        self._forwarder = forwarder
+    
+    def emit(self, record: logging.LogRecord) -> None:
+        # The forwarder's own errors would loop back into it
+        if record.name == logger.name:
+            return
+        level = _LEVEL_FROM_LOGGING.get(record.levelno, LogLevel.INFO)
+        # Check before formatting, which is wasted on a filtered message
+        if not self._forwarder.accepts(level):
+            return
+        try:
+            self._forwarder.forward(level, self.format(record))
+        except Exception:
+            self.handleError(record)
 
-def log_error(message: str) -> None:
-    """Log an error message."""
-    logger.error(message)
-    syslog_forwarder.forward(LogLevel.ERROR, message)
+# Syslog severity for each standard logging level
+_LEVEL_FROM_LOGGING = {
+    logging.DEBUG: LogLevel.DEBUG,
+    logging.INFO: LogLevel.INFO,
+    logging.WARNING: LogLevel.WARNING,
+    logging.ERROR: LogLevel.ERROR,
+    logging.CRITICAL: LogLevel.CRITICAL
+}
 
-def log_critical(message: str) -> None:
-    """Log a critical message."""
-    logger.critical(message)
-    syslog_forwarder.forward(LogLevel.CRITICAL, message)
\ No newline at end of file
+# Global instance, fed by every logger under "loadbalancer"
+syslog_forwarder = SyslogForwarder()
+logging.getLogger("loadbalancer").addHandler(SyslogHandler(syslog_forwarder))
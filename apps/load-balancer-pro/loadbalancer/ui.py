@@ -5,7 +5,8 @@ UI components for the load balancer Jupyter notebook interface.
 import ipywidgets as widgets
 from IPython.display import display, HTML, clear_output
 import plotly.graph_objs as go
-from datetime import datetime, timedelta
+import plotly.io as pio
+from datetime import timedelta
 import threading
 import time
 from typing import List, Dict, Any, Optional, Callable
@@ -296,16 +297,15 @@ class LoadBalancerUI:
             rows = []
             for conn in connections:
                 # Calculate duration
-                duration = datetime.now() - conn.start_time
-                duration_str = str(duration).split('.')[0]  # Remove microseconds
+                duration_str = str(timedelta(seconds=int(conn.duration)))
                 
                 # Format the row
                 rows.append(
                     f'<tr>'
-                    f'<td>{conn.id[:8]}...</td>'  # Truncate UUID to first 8 chars
+                    f'<td>{conn.id:08x}</td>'
                     f'<td>{conn.source}</td>'
                     f'<td>{conn.destination}</td>'
-                    f'<td>{conn.start_time.strftime("%H:%M:%S")}</td>'
+                    f'<td>{conn.start_str}</td>'
                     f'<td>{duration_str}</td>'
                     f'</tr>'
                 )
@@ -318,12 +318,11 @@ class LoadBalancerUI:
     
     def _update_stats_display(self) -> None:
         """Update the statistics display."""
-        stats = self.lb_manager.get_statistics()
+        stats = self.lb_manager.get_counters()
         
         # Format uptime
         if stats["start_time"]:
-            uptime = datetime.now() - stats["start_time"]
-            uptime_str = str(uptime).split('.')[0]  # Remove microseconds
+            uptime_str = str(timedelta(seconds=int(stats["uptime"])))
         else:
             uptime_str = "00:00:00"
         
@@ -354,13 +353,14 @@ class LoadBalancerUI:
         with self.connections_graph_output:
             clear_output(wait=True)
             fig = self.stats_collector.plot_connections(timespan)
-            display(fig)
+            # Already a valid figure dict; skip validating it again
+            pio.show(fig, validate=False)
         
         # Update throughput graph
         with self.throughput_graph_output:
             clear_output(wait=True)
             fig = self.stats_collector.plot_throughput(timespan)
-            display(fig)
+            pio.show(fig, validate=False)
     
     def shutdown(self) -> None:
         """Clean up resources when shutting down."""
@@ -8,12 +8,22 @@ const isDarkMode = window.matchMedia && window.matchMedia('(prefers-color-scheme
 // Refresh data periodically
 function refreshData() {
     fetchStats();
-    fetchConnections();
+    
+    // Prefer pushed connection deltas; poll where EventSource is unavailable
+    if (typeof EventSource !== 'undefined') {
+        streamConnections();
+    } else {
+        fetchConnections();
+    }
     
     // Set interval for regular updates
     setInterval(() => {
         fetchStats();
-        fetchConnections(); 
+        if (connectionStream) {
+            renderStreamedConnections();
+        } else {
+            fetchConnections();
+        }
     }, 2000);
     
     // Update health plot less frequently
@@ -53,6 +63,10 @@ function fetchStats() {
         });
 }
 
+// Uptime as of the stats response that carried it; 304 polls replay the
+// cached body, so the display advances it locally in between
+let uptimeBase = null;
+
 // Update stats display
 function updateStats(data) {
     // Update basic stats
@@ -65,8 +79,13 @@ function updateStats(data) {
     if (activeConns) activeConns.textContent = data.stats.active_connections;
     
     // Format uptime
-    if (uptime && data.stats.start_time) {
-        const uptimeSeconds = data.stats.uptime;
+    if (!data.stats.start_time) {
+        uptimeBase = null;
+    } else if (!uptimeBase || uptimeBase.reported !== data.stats.uptime) {
+        uptimeBase = { reported: data.stats.uptime, at: performance.now() / 1000 };
+    }
+    if (uptime && uptimeBase) {
+        const uptimeSeconds = uptimeBase.reported + performance.now() / 1000 - uptimeBase.at;
         const hours = Math.floor(uptimeSeconds / 3600);
         const minutes = Math.floor((uptimeSeconds % 3600) / 60);
         const seconds = Math.floor(uptimeSeconds % 60);
@@ -106,36 +125,99 @@ function fetchConnections() {
         });
 }
 
-// Update connections table
-function updateConnectionsTable(connections) {
+// Connection rows kept in sync by /api/connections/stream, keyed by id
+let connectionStream = null;
+const streamedConnections = new Map();
+
+// Follow connection changes pushed by the server
+function streamConnections() {
+    connectionStream = new EventSource('/api/connections/stream');
+    
+    // The server resends every connection after a (re)connect
+    connectionStream.onopen = () => {
+        streamedConnections.clear();
+    };
+    
+    connectionStream.onmessage = event => {
+        const delta = JSON.parse(event.data);
+        const now = performance.now() / 1000;
+        
+        delta.del.forEach(id => streamedConnections.delete(String(id)));
+        delta.add.forEach(conn => {
+            conn.received_at = now;
+            streamedConnections.set(String(conn.id), conn);
+        });
+        delta.mod.forEach(change => {
+            const conn = streamedConnections.get(String(change.id));
+            if (conn) {
+                Object.assign(conn, change);
+            }
+        });
+        
+        renderStreamedConnections();
+    };
+    
+    // EventSource retries on its own; fall back to polling once it gives up
+    connectionStream.onerror = () => {
+        if (connectionStream.readyState === EventSource.CLOSED) {
+            connectionStream = null;
+        }
+    };
+}
+
+// Render the streamed connections, extrapolating durations locally
+function renderStreamedConnections() {
+    const now = performance.now() / 1000;
+    const columns = { id: [], source: [], destination: [], start_time: [], duration: [], active: [] };
+    
+    streamedConnections.forEach(conn => {
+        columns.id.push(conn.id);
+        columns.source.push(conn.source);
+        columns.destination.push(conn.destination);
+        columns.start_time.push(conn.start_time);
+        columns.duration.push(conn.duration + (now - conn.received_at));
+        columns.active.push(conn.active);
+    });
+    
+    updateConnectionsTable(columns);
+}
+
+// Update connections table from the columnar /api/connections payload
+function updateConnectionsTable(columns) {
     const table = document.querySelector('table.table');
     if (!table) return;
     
     const tbody = table.querySelector('tbody');
     if (!tbody) return;
     
+    const count = columns.id.length;
+    
     // Handle empty connections
-    if (connections.length === 0) {
+    if (count === 0) {
         tbody.innerHTML = '<tr><td colspan="5" class="text-muted text-center">No active connections</td></tr>';
         return;
     }
     
     // Create a document fragment to minimize DOM operations
     const fragment = document.createDocumentFragment();
+    const existingIds = new Set();
     
     // Create or update rows
-    connections.forEach(conn => {
+    for (let i = 0; i < count; i++) {
+        const connId = String(columns.id[i]);
+        existingIds.add(connId);
+        
         // Check if this connection already exists in the table
-        let row = tbody.querySelector(`tr[data-conn-id="${conn.id}"]`);
+        let row = tbody.querySelector(`tr[data-conn-id="${connId}"]`);
         
         if (!row) {
             // Create new row
             row = document.createElement('tr');
-            row.setAttribute('data-conn-id', conn.id);
+            row.setAttribute('data-conn-id', connId);
             row.classList.add('connection-row');
             
             // Add cells
-            for (let i = 0; i < 5; i++) {
+            for (let j = 0; j < 5; j++) {
                 row.appendChild(document.createElement('td'));
             }
             
@@ -144,30 +226,29 @@ function updateConnectionsTable(connections) {
         
         // Update row cells
         const cells = row.querySelectorAll('td');
-        cells[0].textContent = conn.id.substring(0, 8) + '...';
-        cells[1].textContent = conn.source;
-        cells[2].textContent = conn.destination;
-        cells[3].textContent = conn.start_time;
-        cells[4].textContent = conn.duration.toFixed(1) + 's';
+        cells[0].textContent = connId;
+        cells[1].textContent = columns.source[i];
+        cells[2].textContent = columns.destination[i];
+        cells[3].textContent = columns.start_time[i];
+        cells[4].textContent = columns.duration[i].toFixed(1) + 's';
         
         // Highlight active connections with better contrast that won't disappear on hover
-        if (conn.active) {
+        if (columns.active[i]) {
             row.classList.add('active-connection');
         } else {
             row.classList.remove('active-connection');
         }
-    });
+    }
     
     // Add new rows to the table
     tbody.appendChild(fragment);
     
     // Remove rows for connections that no longer exist
     const existingRows = tbody.querySelectorAll('tr[data-conn-id]');
-    const existingIds = connections.map(conn => conn.id);
     
     existingRows.forEach(row => {
         const connId = row.getAttribute('data-conn-id');
-        if (!existingIds.includes(connId)) {
+        if (!existingIds.has(connId)) {
             row.remove();
         }
     });
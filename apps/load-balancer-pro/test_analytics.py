@@ -0,0 +1,168 @@
+"""
+Tests for analytics history storage: the Series column store and the
+on-disk history files, including the import of the old JSON files.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+from loadbalancer.analytics import AnalyticsCollector
+from loadbalancer.series import Series
+
+
+class SmallSeries(Series):
+    CHUNK = 8
+
+
+def _values(series: Series) -> list:
+    return series.since(np.datetime64(0, "us"))["value"].tolist()
+
+
+def test_series_keeps_the_newest_rows_past_max_entries():
+    series = SmallSeries({"value": np.int64}, max_entries=20)
+    start = datetime.now()
+    for i in range(100):
+        series.append(start + timedelta(seconds=i), value=i)
+        # At most a chunk past max_entries, always the newest rows in order
+        assert len(series) <= 20 + SmallSeries.CHUNK
+        assert _values(series) == list(range(i + 1 - len(series), i + 1))
+    assert series.appended == 100
+    assert len(series) >= 20
+
+    # Only rows after the first 95 appended; dropped rows are skipped
+    assert series.records(95)["value"].tolist() == [95, 96, 97, 98, 99]
+    assert series.records(0)["value"].tolist() == _values(series)
+
+
+def test_series_extend_trims_to_max_entries():
+    series = SmallSeries({"value": np.int64}, max_entries=20)
+    start = np.datetime64(datetime.now(), "us")
+    series.append(start, value=-1)
+    series.extend({
+        "timestamp": start + np.arange(1, 31).astype("timedelta64[s]"),
+        "value": np.arange(30),
+    })
+    assert _values(series) == list(range(10, 30))
+    assert series.appended == 31
+
+    # Appending carries on after an extend
+    series.append(datetime.now() + timedelta(minutes=1), value=30)
+    assert _values(series)[-2:] == [29, 30]
+
+
+def _fill(collector: AnalyticsCollector, start: datetime, count: int) -> None:
+    """Append count samples to every history series, one second apart."""
+    with collector._lock:
+        for i in range(count):
+            now = start + timedelta(seconds=i)
+            collector._connection_history.append(now, active_connections=i, total_connections=10 * i)
+            collector._traffic_history.append(now, bytes_sent=i, bytes_received=2 * i,
+                                              bytes_sent_rate=0.5 * i, bytes_received_rate=1.5)
+            for backend in ("10.0.0.1:80", "10.0.0.2:80"):
+                collector._latency_history.append(now, backend=collector._backend_code(backend), latency=i)
+            collector._health_history.append(now, healthy_backends=i % 3, total_backends=2)
+
+
+def _histories(collector: AnalyticsCollector) -> dict:
+    return {
+        "connections": collector.get_connection_history(),
+        "traffic": collector.get_traffic_history(),
+        "latency": collector.get_latency_history(),
+        "health": collector.get_health_history(),
+    }
+
+
+def _assert_same(first: dict, second: dict) -> None:
+    assert first.keys() == second.keys()
+    for name in first:
+        assert first[name].keys() == second[name].keys()
+        for column in first[name]:
+            np.testing.assert_array_equal(first[name][column], second[name][column])
+
+
+def test_save_and_load_round_trip(tmp_path):
+    collector = AnalyticsCollector(str(tmp_path))
+    start = datetime.now() - timedelta(minutes=10)
+    _fill(collector, start, 30)
+    collector._save_data()
+    # A second save appends only the rows added since the first
+    _fill(collector, start + timedelta(seconds=30), 20)
+    collector._save_data()
+
+    loaded = AnalyticsCollector(str(tmp_path))
+    assert len(loaded._connection_history) == 50
+    _assert_same(_histories(collector), _histories(loaded))
+
+
+def test_concurrent_saves_store_each_row_once(tmp_path):
+    collector = AnalyticsCollector(str(tmp_path))
+    start = datetime.now() - timedelta(minutes=10)
+    _fill(collector, start, 10)
+    collector._save_data()
+    _fill(collector, start + timedelta(seconds=10), 10)
+
+    savers = [threading.Thread(target=collector._save_data) for _ in range(8)]
+    for saver in savers:
+        saver.start()
+    for saver in savers:
+        saver.join()
+
+    loaded = AnalyticsCollector(str(tmp_path))
+    assert len(loaded._connection_history) == 20
+    _assert_same(_histories(collector), _histories(loaded))
+
+
+def test_history_file_is_compacted(tmp_path):
+    collector = AnalyticsCollector(str(tmp_path))
+    # Keeps 4 rows, and at most a chunk of 8 more in memory
+    collector._health_history = SmallSeries({"healthy_backends": np.int16, "total_backends": np.int16}, 4)
+    path = collector._history_file("health_history")
+    itemsize = collector._health_history.record_dtype.itemsize
+    start = datetime.now() - timedelta(minutes=10)
+
+    sizes = []
+    for i in range(5):
+        _fill(collector, start + timedelta(seconds=3 * i), 3)
+        collector._save_data()
+        sizes.append(os.path.getsize(path) // itemsize)
+    # Appended until the file held more than twice max_entries, then
+    # rewritten from the rows still in memory on each save
+    assert sizes == [3, 6, 9, 12, 7]
+    assert len(collector._health_history) == 7
+
+    loaded = AnalyticsCollector(str(tmp_path))
+    _assert_same({"health": collector.get_health_history()}, {"health": loaded.get_health_history()})
+
+
+def test_legacy_json_history_is_migrated(tmp_path):
+    start = datetime.now() - timedelta(minutes=10)
+    stamps = [(start + timedelta(seconds=i)).isoformat() for i in range(5)]
+    legacy = {
+        "connection_history": [{"timestamp": t, "active_connections": i, "total_connections": 10 * i}
+                               for i, t in enumerate(stamps)],
+        "traffic_history": [{"timestamp": t, "bytes_sent": i, "bytes_received": 2 * i,
+                             "bytes_sent_rate": 0.5 * i, "bytes_received_rate": 1.5}
+                            for i, t in enumerate(stamps)],
+        "latency_history": [{"timestamp": t, "backend_latencies": {"10.0.0.1:80": i, "10.0.0.2:80": 2 * i}}
+                            for i, t in enumerate(stamps)],
+        "health_history": [{"timestamp": t, "healthy_backends": 1, "total_backends": 2} for t in stamps],
+    }
+    for name, entries in legacy.items():
+        (tmp_path / f"{name}.json").write_text(json.dumps(entries))
+
+    collector = AnalyticsCollector(str(tmp_path))
+    connections = collector.get_connection_history()
+    assert connections["total_connections"].tolist() == [0, 10, 20, 30, 40]
+    latency = collector.get_latency_history()
+    assert latency["backends"].tolist() == ["10.0.0.1:80", "10.0.0.2:80"]
+    assert latency["latency"].tolist() == [0, 0, 1, 2, 2, 4, 3, 6, 4, 8]
+
+    # The first save writes the binary files, which later starts read instead
+    collector._save_data()
+    assert os.path.exists(collector._history_file("connection_history"))
+    for name in legacy:
+        (tmp_path / f"{name}.json").unlink()
+    _assert_same(_histories(collector), _histories(AnalyticsCollector(str(tmp_path))))
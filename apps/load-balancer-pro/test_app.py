@@ -0,0 +1,107 @@
+"""
+Tests for the Flask dashboard app.
+"""
+
+import json
+import re
+from datetime import timedelta
+
+import pytest
+
+import app as app_module
+
+
+@pytest.fixture
+def started(monkeypatch):
+    """Record start_listener calls instead of opening a port."""
+    calls = []
+    monkeypatch.setattr(app_module.lb_manager, "start_listener",
+                        lambda port, backends: calls.append((port, backends)))
+    monkeypatch.setattr(app_module.analytics_collector, "start", lambda: None)
+    return calls
+
+
+START_FORM = {
+    "port": 18080,
+    "backends": "127.0.0.1:8081\n127.0.0.1:8082",
+    "algorithm": "ip_hash",
+    "enable_health_checks": "y",
+    "health_check_interval": 5,
+    "health_check_timeout": 1,
+    "unhealthy_threshold": 3,
+    "healthy_threshold": 2,
+}
+
+
+def test_start_accepts_token_from_fresh_session(started):
+    client = app_module.app.test_client()
+    page = client.get("/").get_data(as_text=True)
+    token = re.search(r'name="csrf_token" type="hidden" value="([^"]+)"', page).group(1)
+
+    response = client.post("/start", data={**START_FORM, "csrf_token": token})
+    assert response.status_code == 302
+    assert started == [(18080, ["127.0.0.1:8081", "127.0.0.1:8082"])]
+
+
+def test_shared_forms_render_like_fresh_ones():
+    with app_module.app.test_request_context():
+        # Same hidden input a FlaskForm renders for this session
+        assert str(app_module._csrf_field()) == str(app_module.LoadBalancerForm().csrf_token)
+
+    pages = [app_module.app.test_client().get("/").get_data(as_text=True) for _ in range(2)]
+    tokens = [re.search(r'name="csrf_token" type="hidden" value="([^"]+)"', page).group(1) for page in pages]
+    # Each session gets its own token; the shared fields keep their defaults
+    assert tokens[0] != tokens[1]
+    assert "127.0.0.1:8081\n127.0.0.1:8082</textarea>" in pages[0]
+
+
+def test_start_rejects_token_from_another_session(started):
+    page = app_module.app.test_client().get("/").get_data(as_text=True)
+    token = re.search(r'name="csrf_token" type="hidden" value="([^"]+)"', page).group(1)
+
+    response = app_module.app.test_client().post("/start", data={**START_FORM, "csrf_token": token})
+    assert response.status_code == 302
+    assert started == []
+
+
+@pytest.mark.parametrize("seconds", [0, 59.9, 3600, 86399.5, 86400, 90061.25, 3 * 86400 + 7])
+def test_uptime_format_matches_timedelta(seconds):
+    # The dashboard has always shown str(timedelta) without the microseconds
+    expected = str(timedelta(seconds=seconds)).split(".")[0]
+    assert app_module._format_uptime(seconds) == expected
+
+
+def test_connection_stream_is_independent_of_test_servers(monkeypatch):
+    monkeypatch.setattr(app_module, "CONNECTION_STREAM_INTERVAL", 0.01)
+    monkeypatch.setattr(app_module, "CONNECTION_STREAM_MAX_AGE", 0.1)
+    # Stopping the test servers sets their shutdown event
+    app_module.GLOBAL_SHUTDOWN_EVENT.set()
+    try:
+        response = app_module.app.test_client().get("/api/connections/stream")
+        body = response.get_data(as_text=True)
+    finally:
+        app_module.GLOBAL_SHUTDOWN_EVENT.clear()
+
+    # The stream syncs, keeps alive, then ends by itself after its lifetime
+    events = body.split("\n\n")
+    assert events[0].startswith("data: ")
+    assert json.loads(events[0][len("data: "):]) == {"add": [], "mod": [], "del": []}
+    assert ": keepalive" in events[1:]
+
+
+def test_stats_etag_ignores_uptime(monkeypatch):
+    get_statistics = app_module.lb_manager.get_statistics
+    uptimes = iter([5.0, 6.0, 7.0])
+
+    def ticking_statistics(**kwargs):
+        return {**get_statistics(**kwargs), "uptime": next(uptimes)}
+
+    monkeypatch.setattr(app_module, "STATS_CACHE_TTL", 0)
+    monkeypatch.setattr(app_module.lb_manager, "get_statistics", ticking_statistics)
+    client = app_module.app.test_client()
+    first = client.get("/api/stats")
+    assert first.status_code == 200 and first.json["stats"]["uptime"] == 5.0
+
+    # Only the uptime moved, so a poll a second later is not modified
+    again = client.get("/api/stats", headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
@@ -0,0 +1,218 @@
+"""
+Tests for the load balancer core: backend health tracking and selection.
+"""
+
+import socket
+import threading
+from datetime import datetime
+
+import pytest
+
+from loadbalancer.core import LBManager, BackendServer
+
+
+def _manager(*backends: BackendServer, **health_config) -> LBManager:
+    """An LBManager serving the given backends, without a listener."""
+    manager = LBManager()
+    manager.set_health_check_config(**health_config)
+    manager._backends = tuple(backends)
+    manager._backend_by_addr = {backend.address: backend for backend in backends}
+    manager._backend_sockaddrs = {backend.address: backend.sockaddr for backend in backends}
+    manager._backends_version += 1
+    return manager
+
+
+def _record(manager: LBManager, backend: BackendServer, results: str) -> list:
+    """Feed check results ("1" success, "0" failure); returns the health after each."""
+    return [manager._record_health(backend, result == "1", 0.001, datetime.now())
+            for result in results]
+
+
+def test_backend_turns_unhealthy_after_consecutive_failures():
+    backend = BackendServer("10.0.0.1", 80)
+    manager = _manager(backend, unhealthy_threshold=3, healthy_threshold=2)
+    assert _record(manager, backend, "000") == [True, True, False]
+    assert backend.failed_checks == 3
+
+
+def test_backend_turns_healthy_after_consecutive_successes():
+    backend = BackendServer("10.0.0.1", 80)
+    manager = _manager(backend, unhealthy_threshold=3, healthy_threshold=2)
+    _record(manager, backend, "000")
+    assert _record(manager, backend, "11") == [False, True]
+    assert backend.successful_checks == 2
+
+
+@pytest.mark.parametrize("unhealthy_threshold, healthy_threshold", [(3, 2), (2, 4), (1, 1)])
+def test_thresholds_are_independent(unhealthy_threshold, healthy_threshold):
+    backend = BackendServer("10.0.0.1", 80)
+    manager = _manager(backend, unhealthy_threshold=unhealthy_threshold,
+                       healthy_threshold=healthy_threshold)
+    health = _record(manager, backend, "0" * unhealthy_threshold)
+    assert health[-1] is False and all(health[:-1])
+    health = _record(manager, backend, "1" * healthy_threshold)
+    assert health[-1] is True and not any(health[:-1])
+
+
+def test_mixed_results_reset_the_streak():
+    backend = BackendServer("10.0.0.1", 80)
+    manager = _manager(backend, unhealthy_threshold=3, healthy_threshold=2)
+    # A success between failures starts the failure count over
+    assert all(_record(manager, backend, "0010010"))
+    assert backend.failed_checks == 1
+
+    _record(manager, backend, "00")
+    assert not backend.healthy
+    # Likewise a failure between successes
+    assert not any(_record(manager, backend, "10101"))
+    assert _record(manager, backend, "1") == [True]
+
+
+def test_pick_tables_rebuilt_only_on_health_change():
+    backends = BackendServer("10.0.0.1", 80), BackendServer("10.0.0.2", 80)
+    manager = _manager(*backends, unhealthy_threshold=2, healthy_threshold=2)
+    manager.pick_backend()
+    version = manager.backends_version
+    tables = manager._pick_tables
+
+    # Checks that change nothing leave the tables alone
+    _record(manager, backends[0], "1101")
+    manager.pick_backend()
+    assert manager.backends_version == version
+    assert manager._pick_tables is tables
+
+    # Going unhealthy bumps the version once, and picks skip the backend
+    _record(manager, backends[0], "0")
+    assert manager.backends_version == version
+    _record(manager, backends[0], "0")
+    assert manager.backends_version == version + 1
+    assert {manager.pick_backend() for _ in range(4)} == {backends[1].address}
+    assert manager._pick_tables is not tables
+
+    _record(manager, backends[0], "00")
+    assert manager.backends_version == version + 1
+    _record(manager, backends[0], "11")
+    assert manager.backends_version == version + 2
+    assert {manager.pick_backend() for _ in range(4)} == {b.address for b in backends}
+
+
+def _answer(address: str, port: int) -> list:
+    """A getaddrinfo() result holding one IPv4 address."""
+    return [(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP, "", (address, port))]
+
+
+def test_unhealthy_backend_is_resolved_again(monkeypatch):
+    addresses = iter(["10.0.0.1", "10.0.0.2"])
+    monkeypatch.setattr(socket, "getaddrinfo", lambda host, port, *args: _answer(next(addresses), port))
+    backend = BackendServer("backend.internal", 80)
+    assert backend.resolve()
+    manager = _manager(backend, unhealthy_threshold=2)
+
+    _record(manager, backend, "0")
+    assert backend.sockaddr == ("10.0.0.1", 80)
+    # The name moved while the backend was failing; new connections follow it
+    _record(manager, backend, "0")
+    assert backend.sockaddr == ("10.0.0.2", 80)
+    assert manager._backend_sockaddrs == {("backend.internal", 80): ("10.0.0.2", 80)}
+
+
+def test_start_listener_resolves_without_the_lock(monkeypatch):
+    manager = LBManager()
+    manager.set_health_check_config(enabled=False)
+    lock_free = []
+
+    def getaddrinfo(host, port, *args):
+        # A dashboard call made during the lookup must not wait for it
+        caller = threading.Thread(target=manager.is_running)
+        caller.start()
+        caller.join(timeout=2)
+        lock_free.append(not caller.is_alive())
+        return _answer("127.0.0.1", port)
+
+    monkeypatch.setattr(socket, "getaddrinfo", getaddrinfo)
+    manager.start_listener(0, ["backend.internal:8081"])
+    try:
+        assert lock_free == [True]
+        assert manager._backend_sockaddrs == {("backend.internal", 8081): ("127.0.0.1", 8081)}
+    finally:
+        manager.stop_listener()
+
+
+def _hash_manager(count: int) -> LBManager:
+    manager = _manager(*(BackendServer(f"10.0.0.{i}", 80) for i in range(1, count + 1)))
+    manager.set_algorithm(LBManager.IP_HASH)
+    return manager
+
+
+def _assignments(manager: LBManager, client_ips: list) -> dict:
+    """Backend each client IP hashes to, each connection closed before the next."""
+    assignments = {}
+    for client_ip in client_ips:
+        address = manager.pick_backend(client_ip)
+        manager._backend_by_addr[address].active_connections -= 1
+        assignments[client_ip] = address
+    return assignments
+
+
+CLIENT_IPS = [f"192.168.{i // 256}.{i % 256}" for i in range(2000)]
+
+
+def test_ip_hash_is_stable():
+    manager = _hash_manager(5)
+    first = _assignments(manager, CLIENT_IPS)
+    assert _assignments(manager, CLIENT_IPS) == first
+    # A fresh manager with the same backends builds the same ring
+    assert _assignments(_hash_manager(5), CLIENT_IPS) == first
+    assert len(set(first.values())) == 5
+
+
+def test_ip_hash_removing_a_backend_moves_its_clients_only():
+    before = _assignments(_hash_manager(5), CLIENT_IPS)
+    manager = _manager(*(BackendServer(f"10.0.0.{i}", 80) for i in range(1, 5)))
+    manager.set_algorithm(LBManager.IP_HASH)
+    after = _assignments(manager, CLIENT_IPS)
+
+    removed = ("10.0.0.5", 80)
+    moved = [ip for ip in CLIENT_IPS if before[ip] != after[ip]]
+    assert all(before[ip] == removed for ip in moved)
+    assert 0.1 < len(moved) / len(CLIENT_IPS) < 0.3  # About 1/5
+
+
+@pytest.mark.parametrize("client_ips", [CLIENT_IPS[:500], ["203.0.113.7"] * 500])
+def test_ip_hash_bounds_backend_load(client_ips):
+    manager = _hash_manager(4)
+    for picked, client_ip in enumerate(client_ips, 1):
+        manager.pick_backend(client_ip)
+        bound = -(-picked * LBManager.HASH_LOAD_FACTOR // 4)
+        assert max(b.active_connections for b in manager._backends) <= bound
+
+
+def test_ip_hash_with_no_healthy_backends():
+    manager = _hash_manager(3)
+    for backend in manager._backends:
+        _record(manager, backend, "000")
+    _, healthy_backends, _, ring = manager._build_pick_tables()
+    assert manager._pick_ip_hash(ring, healthy_backends, "203.0.113.7") is None
+    # pick_backend still falls back to spreading clients over every backend
+    assert manager.pick_backend("203.0.113.7") in manager._backend_by_addr
+
+    # Once one recovers, every client hashes onto it
+    _record(manager, manager._backends[0], "11")
+    assert {manager.pick_backend(ip) for ip in CLIENT_IPS[:50]} == {manager._backends[0].address}
+
+
+def test_leftover_reactor_thread_does_not_stop_a_later_run():
+    manager = LBManager()
+    manager.set_health_check_config(enabled=False)
+    manager.start_listener(0, ["127.0.0.1:8081"])
+    try:
+        # A reactor thread of an earlier run that outlived stop_listener's join
+        stale_event = threading.Event()
+        stale_event.set()
+        manager._listener_loop(0, stale_event)
+
+        assert manager.is_running()
+        assert not manager._stop_event.is_set()
+    finally:
+        manager.stop_listener()
+    assert not manager.is_running()
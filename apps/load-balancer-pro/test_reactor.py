@@ -0,0 +1,259 @@
+"""
+Integration tests for the proxy reactor: real sockets on 127.0.0.1, an echo
+backend and several clients at once. Each test runs over both forwarding
+paths, splice() through pipes and the buffered recv_into() fallback.
+"""
+
+import errno
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+from loadbalancer.core import LBManager, BackendServer, _Reactor, _HAS_SPLICE
+
+TRAILER = b"-- end of echo --"
+
+
+class EchoBackend:
+    """Echoes each connection's bytes back, then TRAILER once the client half-closes."""
+
+    def __init__(self):
+        self.sock = socket.create_server(("127.0.0.1", 0))
+        self.port = self.sock.getsockname()[1]
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._echo, args=(conn,), daemon=True).start()
+
+    def _echo(self, conn: socket.socket):
+        with conn:
+            while data := conn.recv(65536):
+                conn.sendall(data)
+            conn.sendall(TRAILER)
+
+    def close(self):
+        self.sock.close()
+
+
+class SlowBackend(EchoBackend):
+    """An EchoBackend that reads nothing until released, then reads in small sips."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        super().__init__()
+
+    def _echo(self, conn: socket.socket):
+        with conn:
+            self.release.wait()
+            while data := conn.recv(16384):
+                conn.sendall(data)
+                time.sleep(0.0005)
+            conn.sendall(TRAILER)
+
+
+class Proxy:
+    """A reactor serving an LBManager's backends on an ephemeral port."""
+
+    def __init__(self, manager: LBManager, use_splice: bool):
+        self.manager = manager
+        self.sock = socket.create_server(("127.0.0.1", 0))
+        self.port = self.sock.getsockname()[1]
+        self.reactor = _Reactor(manager, self.sock, use_splice=use_splice,
+                                backend_sockaddrs={b.address: b.sockaddr for b in manager._backends})
+        manager._reactors.append(self.reactor)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self.reactor.run, args=(self._stop,), daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self._stop.set()
+        self.reactor.wake()
+        self._thread.join(timeout=5)
+        self.sock.close()
+
+
+@pytest.fixture(params=[
+    pytest.param(True, id="splice",
+                 marks=pytest.mark.skipif(not _HAS_SPLICE, reason="needs os.splice (Linux)")),
+    pytest.param(False, id="buffered"),
+])
+def use_splice(request):
+    return request.param
+
+
+def _start(backend: EchoBackend, use_splice: bool) -> Proxy:
+    server = BackendServer("127.0.0.1", backend.port)
+    server.resolve()
+    manager = LBManager()
+    manager._backends = (server,)
+    manager._backend_by_addr = {server.address: server}
+    manager._backends_version += 1
+    return Proxy(manager, use_splice)
+
+
+@pytest.fixture
+def proxy(use_splice):
+    backend = EchoBackend()
+    proxy = _start(backend, use_splice)
+    yield proxy
+    proxy.close()
+    backend.close()
+
+
+def _exchange(sock: socket.socket, payload: bytes) -> bytes:
+    """Send payload, half-close, and return everything read until EOF."""
+    def send():
+        sock.sendall(payload)
+        sock.shutdown(socket.SHUT_WR)
+
+    sender = threading.Thread(target=send)
+    sender.start()
+    chunks = []
+    while chunk := sock.recv(262144):
+        chunks.append(chunk)
+    sender.join()
+    return b"".join(chunks)
+
+
+def _wait_for(predicate, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_parallel_clients_echo_exactly(proxy):
+    payloads = [os.urandom(size) for size in (4 << 20, 3 << 20, 2 << 20, 5 << 20, 1, 0)]
+    responses = [None] * len(payloads)
+
+    def client(i):
+        with socket.create_connection(("127.0.0.1", proxy.port)) as sock:
+            responses[i] = _exchange(sock, payloads[i])
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(len(payloads))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+
+    # Each response is the whole payload, then what the backend sent after
+    # seeing the client's half-close
+    for payload, response in zip(payloads, responses):
+        assert response == payload + TRAILER
+
+    manager = proxy.manager
+    assert _wait_for(lambda: manager.get_counters()["active_connections"] == 0)
+    counters = manager.get_counters()
+    assert counters["total_connections"] == len(payloads)
+    assert counters["bytes_sent"] == sum(map(len, payloads))
+    assert counters["bytes_received"] == sum(map(len, payloads)) + len(TRAILER) * len(payloads)
+    assert manager._backends[0].active_connections == 0
+    assert manager.list_connections() == []
+
+    history = manager.get_history()
+    assert sorted(conn["bytes_sent"] for conn in history) == sorted(map(len, payloads))
+    assert all(conn["bytes_received"] == conn["bytes_sent"] + len(TRAILER) for conn in history)
+
+
+def test_slow_backend_applies_backpressure(use_splice):
+    backend = SlowBackend()
+    proxy = _start(backend, use_splice)
+    payload = os.urandom(32 << 20)
+    try:
+        with socket.create_connection(("127.0.0.1", proxy.port)) as sock:
+            # Push as much as the proxy takes while the backend reads nothing
+            sock.setblocking(False)
+            view = memoryview(payload)
+            sent = 0
+            deadline = time.monotonic() + 1.0
+            while time.monotonic() < deadline:
+                try:
+                    sent += sock.send(view[sent:sent + 65536])
+                except BlockingIOError:
+                    time.sleep(0.01)
+            # Only socket buffers and one pipe/buffer per side hold bytes,
+            # so the proxy stopped reading from the client long before the end
+            assert 0 < sent < len(payload) // 2
+
+            backend.release.set()
+            sock.setblocking(True)
+            response = _exchange(sock, view[sent:])
+        assert response == payload + TRAILER
+
+        assert _wait_for(lambda: proxy.manager.get_counters()["active_connections"] == 0)
+        counters = proxy.manager.get_counters()
+        assert counters["bytes_sent"] == len(payload)
+        assert counters["bytes_received"] == len(payload) + len(TRAILER)
+    finally:
+        proxy.close()
+        backend.close()
+
+
+def test_out_of_descriptors_turns_one_client_away(proxy, monkeypatch):
+    new_backend_socket = proxy.reactor._new_backend_socket
+    failures = [OSError(errno.EMFILE, os.strerror(errno.EMFILE))]
+
+    def failing_backend_socket():
+        if failures:
+            raise failures.pop()
+        return new_backend_socket()
+
+    monkeypatch.setattr(proxy.reactor, "_new_backend_socket", failing_backend_socket)
+    with socket.create_connection(("127.0.0.1", proxy.port)) as sock:
+        sock.settimeout(5)
+        try:
+            assert sock.recv(1) == b""
+        except ConnectionResetError:
+            pass
+
+    # The listener keeps serving, and the refused client left no count behind
+    with socket.create_connection(("127.0.0.1", proxy.port)) as sock:
+        assert _exchange(sock, b"still here") == b"still here" + TRAILER
+    manager = proxy.manager
+    assert _wait_for(lambda: manager._backends[0].active_connections == 0)
+    assert manager.get_counters()["total_connections"] == 1
+
+
+class _FailingListener:
+    """Wraps a listening socket so accept() fails with EMFILE while failing is set."""
+
+    def __init__(self, sock: socket.socket):
+        self._sock = sock
+        self.failing = True
+        self.accepts = 0
+
+    def fileno(self):
+        return self._sock.fileno()
+
+    def accept(self):
+        self.accepts += 1
+        if self.failing:
+            raise OSError(errno.EMFILE, os.strerror(errno.EMFILE))
+        return self._sock.accept()
+
+
+def test_accept_out_of_descriptors_pauses_instead_of_spinning(use_splice):
+    backend = EchoBackend()
+    proxy = _start(backend, use_splice)
+    listener = proxy.reactor._server = _FailingListener(proxy.sock)
+    try:
+        with socket.create_connection(("127.0.0.1", proxy.port)) as sock:
+            time.sleep(0.5)
+            # Retried every ACCEPT_RETRY_DELAY, not on every select() wakeup
+            assert 1 <= listener.accepts <= 0.5 / _Reactor.ACCEPT_RETRY_DELAY + 2
+
+            listener.failing = False
+            assert _exchange(sock, b"let in") == b"let in" + TRAILER
+    finally:
+        proxy.close()
+        backend.close()
@@ -0,0 +1,58 @@
+"""
+Tests for syslog forwarding: delivery, drop accounting and reconfiguration.
+"""
+
+import socket
+import time
+
+import pytest
+
+from loadbalancer.syslog import LogLevel, SyslogForwarder
+
+
+@pytest.fixture
+def forwarder():
+    forwarder = SyslogForwarder()
+    yield forwarder
+    forwarder.stop()
+
+
+@pytest.fixture
+def udp_server():
+    server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    server.bind(("127.0.0.1", 0))
+    server.settimeout(2)
+    yield server
+    server.close()
+
+
+def test_failed_datagram_drops_the_rest_of_the_batch(forwarder, udp_server):
+    # Queued before the sender starts, so all four go in one batch; the
+    # second is too large for a datagram and its send fails
+    for message in ("first", "x" * 70000, "third", "fourth"):
+        forwarder._log_queue.append((LogLevel.ERROR, message))
+    forwarder.configure(enabled=True, port=udp_server.getsockname()[1])
+
+    assert udp_server.recv(2000).endswith(b"first")
+    deadline = time.monotonic() + 2
+    while forwarder.get_config()["dropped"] < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert forwarder.get_config()["dropped"] == 3
+
+
+def test_changing_protocol_restarts_the_sender(forwarder, udp_server):
+    forwarder.configure(enabled=True, port=udp_server.getsockname()[1])
+    forwarder.forward(LogLevel.ERROR, "over udp")
+    assert udp_server.recv(2000).endswith(b"over udp")
+
+    with socket.socket() as tcp_server:
+        tcp_server.bind(("127.0.0.1", 0))
+        tcp_server.listen()
+        tcp_server.settimeout(2)
+        forwarder.configure(enabled=True, port=tcp_server.getsockname()[1], protocol="tcp")
+        forwarder.forward(LogLevel.ERROR, "over tcp")
+
+        conn, _ = tcp_server.accept()
+        with conn:
+            conn.settimeout(2)
+            assert conn.recv(2000).endswith(b"over tcp\n")
@@ -0,0 +1,24 @@
+"""
+Python Load Balancer - WSGI Entrypoint
+Serves the web interface from app.py with a production WSGI server
+instead of the Werkzeug development server.
+
+    gunicorn -k gthread -w 1 --threads 32 wsgi:app
+
+Run a single worker: the load balancer, analytics collector and test
+servers live in process memory, so every extra worker would get its own
+independent load balancer. Concurrency comes from the worker's threads;
+each open connection stream holds one, so allow a few beyond the number
+of dashboards expected. The proxy's reactors run on their own OS threads
+and need no monkey-patching.
+
+Running `python wsgi.py` serves the app with the threaded Werkzeug server.
+"""
+
+import os
+
+from app import app
+
+if __name__ == "__main__":
+    port = int(os.environ.get('PORT', 5000))
+    app.run(host='0.0.0.0', port=port, debug=False, threaded=True)